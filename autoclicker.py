@@ -3,26 +3,58 @@ import os
 import json
 import time
 import threading
-from dataclasses import dataclass, field
-from typing import List, Tuple, Dict, Any
-
-from PySide6.QtCore import Qt, Signal, QObject, QThread, QTimer
+from functools import partial
+from typing import List, Tuple, Dict, Any, Optional, Callable
+
+# ====== Linha de comando: "run"/"click" rodam sem Qt (ver macro_cli.py)
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] in ("run", "click", "--backend", "--json"):
+    from macro_cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
+# ====== Medição da inicialização (--profile-startup)
+# Marcas de tempo por fase; detalhe por módulo com python -X importtime.
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+STARTUP_T0 = time.perf_counter()
+STARTUP_TARGET_S = 1.0  # meta de partida a frio: do início do módulo à janela visível
+STARTUP_MARKS: List[Tuple[str, float]] = []
+
+def startup_mark(label: str):
+    if PROFILE_STARTUP:
+        STARTUP_MARKS.append((label, time.perf_counter()))
+
+from PySide6.QtCore import Qt, Signal, QObject, QTimer, QAbstractListModel, QModelIndex
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QLineEdit, QCheckBox, QSlider, QSpinBox, QTextEdit, QListWidget, QListWidgetItem,
-    QStackedWidget, QFrame, QMessageBox, QComboBox, QFileDialog, QSizePolicy, QGridLayout
+    QLineEdit, QCheckBox, QSlider, QSpinBox, QTextEdit,
+    QStackedWidget, QFrame, QMessageBox, QComboBox, QFileDialog, QGridLayout, QListView,
+    QDoubleSpinBox, QPlainTextEdit
 )
-from PySide6.QtGui import QIcon, QFont, QPalette, QColor, QCursor
+from PySide6.QtGui import QIcon, QFont, QCursor, QTextCursor
+startup_mark("import PySide6")
 
 # ====== Automação de teclado e mouse
-from pynput.keyboard import Controller, Listener, Key, KeyCode
-from pynput.mouse import Controller as MouseController, Button as MouseButton, Listener as MouseListener
+from pynput.keyboard import Listener, Key, KeyCode
+from pynput.mouse import Button as MouseButton, Listener as MouseListener
+startup_mark("import pynput")
+
+from macro_engine import (
+    MoveFilter, MoveCoalescer, simplify_mouse_macro, fold_loops, loop_regions,
+    ReplaySpeed, SPEED_MIN, SPEED_MAX, compile_plan, plan_steps, stream_steps, estimate_runtime, played_events, Telemetry, InputMonitor, HeldKeys,
+    Job, PacedJob, SequenceJob, JobScheduler,
+    EventRing, RingConsumer, Macro, SessionClock, NS, OP_PRESS, OP_RELEASE, OP_MOVE, OP_CLICK, OP_SCROLL, OP_POSITION, OP_LOOP, OP_WAIT
+)
+from input_backend import PynputBackend, resolve_symbols, make_binder
+from hotkeys import HotkeyRegistry, DEFAULT_HOTKEYS
+from macro_store import MacroFile, MacroFormatError, ProfileStore, PROFILES_DIR, write_macro, read_macro
+from macro_script import ScriptError, compile_script
+startup_mark("import motor")
 
-keyboard = Controller()
-mouse = MouseController()
+# Toda injeção de eventos passa pelo backend (ver input_backend.py)
+backend = PynputBackend()
+startup_mark("backend de entrada")
 
 CONFIG_FILE = "macro_dashboard_qt.json"
-PROFILES_FILE = "macro_profiles.json"
+PROFILES_FILE = "macro_profiles.json"  # formato antigo, migrado para PROFILES_DIR
 
 # ----- Teclas especiais mapeadas
 SPECIAL_KEYS: Dict[str, Key] = {
@@ -37,154 +69,216 @@ SPECIAL_KEYS: Dict[str, Key] = {
 }
 
 # ====== Estado e comunicação com a UI via sinais (thread-safe)
+# Status, contador e CPS não passam por sinais: o status fica na Telemetry e
+# os contadores nos jobs ativos, amostrados pela janela a TELEMETRY_HZ.
+TELEMETRY_HZ = 30
+
 class Bus(QObject):
-    status = Signal(str)      # texto de status
-    counter = Signal(int)     # repetições
-    macro_teclado_text = Signal(str)
-    macro_mouse_text = Signal(str)
+    macro_teclado_changed = Signal(object)  # Macro substituída (gravação nova, limpeza, carga)
+    macro_mouse_changed = Signal(object)
+    hotkey = Signal(str)  # ação de um atalho global, entregue na thread da UI
+    config_loaded = Signal(object)    # (cfg, macro_teclado, macro_mouse) lidos em segundo plano
+    profiles_loaded = Signal(object)  # (ProfileStore com o índice carregado, erro)
+    macro_folded = Signal(object)     # (alvo, macro original, linhas na partida, macro dobrada)
+    runtime_estimated = Signal(object)  # (chave, duração teclado, duração mouse) da prévia
+    script_compiled = Signal(object)    # (texto, macro ou ScriptError, resumo, continuação)
 
 bus = Bus()
 
-# ====== Estado global simples (poderia virar uma classe dedicada)
-executando = False
+# ====== Estado global simples
+jobs = JobScheduler()  # um thread de tempo para todos os auto clickers e macros, simultâneos
+# Nomes dos jobs: cada um inicia/para sozinho e aparece assim no status
+JOB_AUTO_TECLADO = "Auto Clicker (Teclado)"
+JOB_AUTO_MOUSE = "Auto Clicker (Mouse)"
+JOB_MACRO_TECLADO = "Macro (Teclado)"
+JOB_MACRO_MOUSE = "Macro (Mouse)"
+JOB_MACRO_ARQUIVO = "Macro (Arquivo)"
+JOB_MACRO_SCRIPT = "Macro (Script)"
 gravando = False
 gravando_mouse = False
-contador = 0
-macro_gravado_teclado: List[Tuple[Any, str, float]] = []  # (tecla, "press"/"release", delay_base)
-macro_gravado_mouse: List[Tuple[Any, Any, float]] = [] # (tipo, valor, delay_base)
-ultimo_tempo = 0.0 # <--- Variável global para gravação de tempo
-
-def fmt_macro_lines_teclado(macro: List[Tuple[Any, str, float]]) -> str:
-    lines = []
-    for i, (t, a, d) in enumerate(macro):
-        delay_str = f"{d:.4f}s" if d > 0.001 else "0.000s"
-        lines.append(f"{i+1:02d}: {str(t).replace('Key.', '')} - {a.capitalize()} (Delay: {delay_str})")
-    return "\n".join(lines)
-
-def fmt_macro_lines_mouse(macro: List[Tuple[Any, Any, float]]) -> str:
-    lines = []
-    for i, (action_type, value, d) in enumerate(macro):
-        delay_str = f"{d:.4f}s" if d > 0.001 else "0.000s"
-        if action_type == "move":
-            lines.append(f"{i+1:02d}: Mover para ({value[0]}, {value[1]}) (Delay: {delay_str})")
-        elif action_type == "click":
-            lines.append(f"{i+1:02d}: Clique {str(value).split('.')[-1].capitalize()} (Delay: {delay_str})")
-        elif action_type == "scroll":
-            lines.append(f"{i+1:02d}: Rolagem {value[0]} (Delay: {delay_str})")
-        elif action_type == "position":
-             lines.append(f"{i+1:02d}: Pos. Fixa ({value[0]}, {value[1]})")
-    return "\n".join(lines)
+gravando_misto = False  # teclado + mouse gravados juntos em macro_gravado_teclado
+telemetry = Telemetry()
+macro_gravado_teclado = Macro()  # OP_PRESS/OP_RELEASE (+ eventos de mouse no modo misto)
+macro_gravado_mouse = Macro()    # OP_MOVE/OP_CLICK/OP_SCROLL/OP_POSITION
+# Relógios monotônicos de gravação, um por fluxo de dispositivo
+relogio_teclado = SessionClock()
+relogio_mouse = SessionClock()
+move_filter = MoveCoalescer(MoveFilter())  # filtro de movimentos na gravação do mouse
+replay_speed = ReplaySpeed()  # velocidade de reprodução das macros (teclado, mouse e .acm)
+input_monitor = InputMonitor()  # painel de telemetria de entrada (só ativo com o painel visível)
+hotkeys = HotkeyRegistry()  # acorde -> ação; consultado pelo consumidor do ring de teclado
+hotkeys.load(DEFAULT_HOTKEYS)
+
+# ----- Tecla/botão do listener (pynput) -> nome na tabela de símbolos da Macro
+def key_name(key) -> str:
+    if isinstance(key, KeyCode):
+        return key.char if key.char is not None else f"<{key.vk}>"
+    return str(key)  # "Key.space", "Button.left"
+
+# Formatação de uma única linha: a view só formata as linhas visíveis
+def fmt_macro_line(i: int, macro: Macro) -> str:
+    op, x, y, code, _ = macro[i]
+    d = macro.delay_ns(i) / NS
+    delay_str = f"{d:.4f}s" if d > 0.001 else "0.000s"
+    if op == OP_PRESS or op == OP_RELEASE:
+        acao = "Press" if op == OP_PRESS else "Release"
+        return f"{i+1:02d}: {macro.symbols[code].replace('Key.', '')} - {acao} (Delay: {delay_str})"
+    elif op == OP_MOVE:
+        return f"{i+1:02d}: Mover para ({x}, {y}) (Delay: {delay_str})"
+    elif op == OP_CLICK:
+        vezes = f" ×{x}" if x > 1 else ""
+        return f"{i+1:02d}: Clique {macro.symbols[code].split('.')[-1].capitalize()}{vezes} (Delay: {delay_str})"
+    elif op == OP_SCROLL:
+        return f"{i+1:02d}: Rolagem {'para cima' if y > 0 else 'para baixo'} (Delay: {delay_str})"
+    elif op == OP_POSITION:
+        return f"{i+1:02d}: Pos. Fixa ({x}, {y})"
+    elif op == OP_LOOP:
+        return f"{i+1:02d}: ↻ Repetir {y} linha(s) acima ×{x} (Delay: {delay_str})"
+    elif op == OP_WAIT:
+        return f"{i+1:02d}: Espera (Delay: {delay_str})"
+    return f"{i+1:02d}: op {op}"
 
 
 # ====== Worker helpers
 def set_status(text: str):
-    bus.status.emit(text)
+    telemetry.set_status(text)
 
-def set_counter(value: int):
-    bus.counter.emit(value)
+# Só avisa a UI quando a lista é trocada; appends durante a gravação são
+# descobertos pelo timer do MacroListModel
+def set_macro_teclado(macro: Macro):
+    bus.macro_teclado_changed.emit(macro)
 
-def set_macro_text_teclado(macro: List[Tuple[Any, str, float]]):
-    bus.macro_teclado_text.emit(fmt_macro_lines_teclado(macro))
+def set_macro_mouse(macro: Macro):
+    bus.macro_mouse_changed.emit(macro)
 
-def set_macro_text_mouse(macro: List[Tuple[Any, Any, float]]):
-    bus.macro_mouse_text.emit(fmt_macro_lines_mouse(macro))
+
+# ====== Configuração (sem widgets: pode rodar fora da thread da UI)
+def read_config() -> Optional[Tuple[dict, Macro, Macro]]:
+    if not os.path.exists(CONFIG_FILE):
+        return None
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    macros = []
+    for chave, nome in (("macro_teclado", "teclado"), ("macro_mouse", "mouse")):
+        try:
+            macros.append(Macro.from_json(cfg.get(chave, [])))
+        except (ValueError, TypeError, IndexError) as e:
+            print(f"Aviso: macro de {nome} inválida não foi carregada ({e}).")
+            macros.append(Macro())
+    return cfg, macros[0], macros[1]
 
 
 # ====== Listeners globais
+# Os callbacks do pynput rodam na thread do hook do SO: só leem o relógio e
+# empurram o evento cru no ring. Normalização, filtro, atalhos e avisos à UI
+# ficam com o consumidor (RingConsumer), fora do caminho da entrada do sistema.
+ring_teclado = EventRing()
+ring_mouse = EventRing()
+
 def start_global_listener(main_window):
-    global ultimo_tempo, macro_gravado_teclado, gravando, gravando_mouse
-    
-    # Flags para as teclas modificadoras (Ctrl e Shift)
-    ctrl_pressed = False
-    shift_pressed = False
+    # Última posição vista pelo listener do mouse (tupla trocada de uma vez
+    # pela thread do hook); semeada aqui, na thread da UI
+    cursor = [(QCursor.pos().x(), QCursor.pos().y())]
+    perdidos = [0]  # overruns do ring de teclado já vistos pelo consumidor
+
+    # ----- Consumidor (thread própria)
+    def handle_teclado(op, stamp, _a, _b, key):
+        n = ring_teclado.overruns
+        if n != perdidos[0]:
+            if n > perdidos[0]:
+                hotkeys.reset()  # pode ter perdido o release de um modificador
+            perdidos[0] = n  # menor: reset_stats() no início de uma gravação
+        nome = key_name(key)
+        if op == OP_RELEASE:
+            hotkeys.release(nome)
+            if gravando and key != Key.esc:  # ESC já tratado no press
+                m = macro_gravado_teclado
+                m.append_key(OP_RELEASE, nome, max(relogio_teclado.since(stamp), m.end_ns))
+            return
 
-    def on_press_teclado(key):
-        nonlocal ctrl_pressed, shift_pressed
-        global gravando, ultimo_tempo, macro_gravado_teclado
-        
-        # Monitora o estado das teclas Ctrl e Shift
-        if key == Key.ctrl_l or key == Key.ctrl_r:
-            ctrl_pressed = True
-        if key == Key.shift_l or key == Key.shift_r:
-            shift_pressed = True
-
-        # Atalho para capturar a posição do mouse
-        if ctrl_pressed and shift_pressed and isinstance(key, KeyCode) and key.char == 'c':
-            main_window.capture_mouse_position()
+        # Atalhos: lookup por (modificadores, tecla) com debounce; sem threads
+        # novas, a ação vira um sinal tratado na thread da UI
+        acao = hotkeys.press(nome, stamp)
+        if acao == "capturar_posicao":
+            # Nesta thread, a mesma que grava: a posição entra na ordem certa
+            main_window.capture_mouse_position(*cursor[0])
             return
-        
+        if acao is not None:
+            bus.hotkey.emit(acao)
+
         if gravando:
             if key == Key.esc:
                 main_window.stop_record_teclado()
                 return
-            agora = time.time()
-            atraso = agora - ultimo_tempo if ultimo_tempo != 0 else 0.0
-            macro_gravado_teclado.append((key, "press", atraso))
-            ultimo_tempo = agora
-            set_macro_text_teclado(macro_gravado_teclado)
+            m = macro_gravado_teclado
+            m.append_key(OP_PRESS, nome, max(relogio_teclado.since(stamp), m.end_ns))
+
+    def handle_mouse(op, stamp, x, y, button):
+        if not (gravando_mouse or gravando_misto):
+            return  # publicado depois do fim da gravação
+        if gravando_misto:
+            # Mesma linha do tempo do teclado; o max() cobre a corrida de poucos µs
+            # entre um evento já consumido de um ring e um mais antigo ainda no outro
+            m = macro_gravado_teclado
+            agora = max(relogio_teclado.since(stamp), m.end_ns)
+        else:
+            m = macro_gravado_mouse
+            agora = relogio_mouse.since(stamp)
+        if op == OP_MOVE:
+            if move_filter.should_merge(agora, x, y) and m and m.op[-1] == OP_MOVE:
+                # Funde com o movimento anterior: mesma linha, posição e instante atualizados
+                m.x[-1] = x
+                m.y[-1] = y
+                m.t_ns[-1] = agora
+            else:
+                m.append(OP_MOVE, agora, x, y)
+        elif op == OP_CLICK:
+            move_filter.break_run()
+            m.append_key(OP_CLICK, key_name(button), agora)
+        elif op == OP_SCROLL:
+            move_filter.break_run()
+            m.append(OP_SCROLL, agora, 0, y)
+
+    recorder = RingConsumer([(ring_teclado, handle_teclado), (ring_mouse, handle_mouse)])
+    recorder.start()
+
+    # ----- Produtores (threads do hook)
+    clock = time.perf_counter_ns
+
+    monitor = input_monitor
+
+    def on_press_teclado(key):
+        t = clock()
+        ring_teclado.push(OP_PRESS, t, 0, 0, key)
+        if monitor.enabled: monitor.key(t)
 
     def on_release_teclado(key):
-        nonlocal ctrl_pressed, shift_pressed
-        global gravando, ultimo_tempo, macro_gravado_teclado
-        
-        if key == Key.ctrl_l or key == Key.ctrl_r:
-            ctrl_pressed = False
-        if key == Key.shift_l or key == Key.shift_r:
-            shift_pressed = False
-        
-        if gravando:
-            if key == Key.esc:
-                return # Já tratado no press
-            agora = time.time()
-            atraso = agora - ultimo_tempo
-            macro_gravado_teclado.append((key, "release", atraso))
-            ultimo_tempo = agora
-            set_macro_text_teclado(macro_gravado_teclado)
-    
+        t = clock()
+        ring_teclado.push(OP_RELEASE, t, 0, 0, key)
+        if monitor.enabled: monitor.key(t)
+
     def on_move_mouse(x, y):
-        global gravando_mouse, ultimo_tempo, macro_gravado_mouse
-        if gravando_mouse:
-            agora = time.time()
-            atraso = agora - ultimo_tempo
-            macro_gravado_mouse.append(("move", (x, y), atraso))
-            ultimo_tempo = agora
-            set_macro_text_mouse(macro_gravado_mouse)
+        t = clock()
+        cursor[0] = (x, y)
+        if gravando_mouse or gravando_misto:
+            ring_mouse.push(OP_MOVE, t, x, y)
+        if monitor.enabled: monitor.move(x, y, t)
 
     def on_click_mouse(x, y, button, pressed):
-        global gravando_mouse, ultimo_tempo, macro_gravado_mouse
-        if gravando_mouse:
-            agora = time.time()
-            atraso = agora - ultimo_tempo
-            if pressed:
-                macro_gravado_mouse.append(("click", button, atraso))
-                ultimo_tempo = agora
-                set_macro_text_mouse(macro_gravado_mouse)
+        t = clock()
+        cursor[0] = (x, y)
+        if pressed and (gravando_mouse or gravando_misto):
+            ring_mouse.push(OP_CLICK, t, x, y, button)
+        if monitor.enabled: monitor.button(t)
 
     def on_scroll_mouse(x, y, dx, dy):
-        global gravando_mouse, ultimo_tempo, macro_gravado_mouse
-        if gravando_mouse:
-            agora = time.time()
-            atraso = agora - ultimo_tempo
-            direction = "para cima" if dy > 0 else "para baixo"
-            macro_gravado_mouse.append(("scroll", (direction, dy), atraso))
-            ultimo_tempo = agora
-            set_macro_text_mouse(macro_gravado_mouse)
-
-    def on_press_global(key):
-        try:
-            if key == Key.f6:
-                threading.Thread(target=main_window.start_auto_click_teclado, daemon=True).start()
-            elif key == Key.f7:
-                threading.Thread(target=main_window.start_auto_click_mouse, daemon=True).start()
-            elif key == Key.f8:
-                threading.Thread(target=main_window.start_macro_teclado, daemon=True).start()
-            elif key == Key.f9:
-                main_window.stop_all()
-        except Exception:
-            pass
+        t = clock()
+        if gravando_mouse or gravando_misto:
+            ring_mouse.push(OP_SCROLL, t, dx, dy)
+        if monitor.enabled: monitor.button(t)
 
     keyboard_listener = Listener(
-        on_press=lambda k: [on_press_teclado(k), on_press_global(k)],
+        on_press=on_press_teclado,
         on_release=on_release_teclado
     )
     keyboard_listener.daemon = True
@@ -198,7 +292,129 @@ def start_global_listener(main_window):
     mouse_listener.daemon = True
     mouse_listener.start()
 
-    return keyboard_listener, mouse_listener
+    return keyboard_listener, mouse_listener, recorder
+
+
+# ====== View incremental das macros
+
+MACRO_VIEW_FPS = 30  # frequência máxima de atualização da lista durante a gravação
+
+class MacroListModel(QAbstractListModel):
+    # Modelo append-only sobre a Macro: as linhas novas são
+    # anunciadas em lote a cada frame e só as visíveis são formatadas.
+    # A última linha pode mudar no lugar (movimentos fundidos na gravação).
+    def __init__(self, formatter, parent=None):
+        super().__init__(parent)
+        self._fmt = formatter
+        self._macro = Macro()
+        self._rows = 0
+        self._ultima: Optional[Tuple[int, int, int]] = None  # (x, y, t_ns) da última linha anunciada
+        self._corpo = bytearray()  # 1 = linha dentro do corpo de um laço dobrado
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000 // MACRO_VIEW_FPS)
+        self._timer.timeout.connect(self.sync)
+        self._timer.start()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            row = index.row()
+            texto = self._fmt(row, self._macro)
+            if row < len(self._corpo) and self._corpo[row]:
+                return "    │ " + texto
+            return texto
+        return None
+
+    def set_macro(self, macro: Macro):
+        self.beginResetModel()
+        self._macro = macro
+        self._rows = len(macro)
+        # Laços são marcados uma vez aqui; a gravação só acrescenta linhas fora deles
+        self._corpo = bytearray(len(macro)) if macro.has_loops else bytearray()
+        for inicio, marcador in loop_regions(macro):
+            self._corpo[inicio:marcador] = b"\x01" * (marcador - inicio)
+        self._ultima = self._last_row()
+        self.endResetModel()
+
+    def _last_row(self) -> Optional[Tuple[int, int, int]]:
+        m, i = self._macro, self._rows - 1
+        return (m.x[i], m.y[i], m.t_ns[i]) if i >= 0 else None
+
+    def sync(self):
+        n = len(self._macro)
+        if self._rows and self._last_row() != self._ultima:
+            idx = self.index(self._rows - 1)
+            self.dataChanged.emit(idx, idx, [Qt.DisplayRole])
+        if n > self._rows:
+            self.beginInsertRows(QModelIndex(), self._rows, n - 1)
+            self._rows = n
+            self.endInsertRows()
+        self._ultima = self._last_row()
+
+
+def make_macro_view(model: MacroListModel) -> QListView:
+    view = QListView()
+    view.setModel(model)
+    view.setUniformItemSizes(True)  # altura fixa: rolagem O(1) em listas enormes
+    view.setMinimumHeight(160)
+    model.rowsInserted.connect(lambda *_: view.scrollToBottom())
+    return view
+
+
+class InputTelemetryPanel(QFrame):
+    # Posição do cursor, eventos/s por dispositivo e pior callback dos
+    # listeners, vindos dos próprios eventos do hook (InputMonitor). O timer
+    # roda no ritmo da tela e só enquanto o painel está visível; cada rótulo
+    # só é redesenhado quando o texto muda.
+    def __init__(self, monitor: InputMonitor):
+        super().__init__()
+        self.monitor = monitor
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.lbl_mouse_pos = QLabel("Posição atual: (0, 0)")
+        self.lbl_mouse_pos.setStyleSheet("color: #a0a0b0; font-size: 16px; font-weight: bold;")
+        self.lbl_mouse_pos.setAlignment(Qt.AlignCenter)
+        self.lbl_rates = QLabel("Teclado: 0 ev/s | Mouse: 0 ev/s")
+        self.lbl_latency = QLabel("Callback dos listeners: pior —")
+        for lbl in (self.lbl_rates, self.lbl_latency):
+            lbl.setStyleSheet("color: #a0a0b0; font-size: 12px;")
+            lbl.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.lbl_mouse_pos)
+        layout.addWidget(self.lbl_rates)
+        layout.addWidget(self.lbl_latency)
+        self._labels = (self.lbl_mouse_pos, self.lbl_rates, self.lbl_latency)
+        self._texts = tuple(lbl.text() for lbl in self._labels)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        screen = self.screen()
+        hz = screen.refreshRate() if screen is not None else 0.0
+        self._timer.setInterval(max(1, round(1000 / (hz if hz > 0 else 60.0))))
+        pos = QCursor.pos()
+        self.monitor.start(pos.x(), pos.y())
+        self._timer.start()
+        self.refresh()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        self.monitor.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        x, y, teclado, mouse, lat_ns = self.monitor.sample()
+        texts = (
+            f"Posição atual: ({x}, {y})",
+            f"Teclado: {teclado:.0f} ev/s | Mouse: {mouse:.0f} ev/s",
+            f"Callback dos listeners: pior {lat_ns / 1000:.1f}µs (painel aberto)" if lat_ns else "Callback dos listeners: pior —",
+        )
+        for lbl, antes, agora in zip(self._labels, self._texts, texts):
+            if antes != agora:
+                lbl.setText(agora)
+        self._texts = texts
 
 
 # ====== Páginas (QWidgets)
@@ -284,6 +500,27 @@ class PageAutoClickers(QWidget):
         self.spin_reps.setEnabled(False) # Inicia desabilitado
         row_rep.addWidget(self.spin_reps)
         config_layout.addLayout(row_rep)
+
+        # Modo turbo: alvo em cliques por segundo, sem o piso de 1 ms do slider
+        row_turbo = QHBoxLayout()
+        self.chk_turbo = QCheckBox("Modo turbo")
+        self.chk_turbo.stateChanged.connect(self._toggle_turbo)
+        row_turbo.addWidget(self.chk_turbo)
+        row_turbo.addWidget(QLabel("CPS alvo:"))
+        self.spin_cps = QDoubleSpinBox()
+        self.spin_cps.setRange(1.0, 100000.0)
+        self.spin_cps.setDecimals(1)
+        self.spin_cps.setValue(100.0)
+        row_turbo.addWidget(self.spin_cps)
+        row_turbo.addWidget(QLabel("Cliques por ciclo:"))
+        self.spin_burst = QSpinBox()
+        self.spin_burst.setRange(1, 1000)
+        self.spin_burst.setValue(1)
+        row_turbo.addWidget(self.spin_burst)
+        self.lbl_turbo_stats = QLabel("Alcançado: — CPS | jitter —")
+        row_turbo.addWidget(self.lbl_turbo_stats)
+        config_layout.addLayout(row_turbo)
+        self._toggle_turbo(self.chk_turbo.checkState())
         
         root.addWidget(config_frame)
         
@@ -292,9 +529,11 @@ class PageAutoClickers(QWidget):
         self.btn_start_keyboard_ac.setObjectName("startButton")
         self.btn_start_mouse_ac = QPushButton("▶ Iniciar Auto Clicker Mouse (F7)")
         self.btn_start_mouse_ac.setObjectName("startButton")
+        self.btn_pause = QPushButton("⏸ Pausar / Retomar")
         self.btn_stop = QPushButton("⏹ Parar Tudo (F9)")
         row_btns.addWidget(self.btn_start_keyboard_ac)
         row_btns.addWidget(self.btn_start_mouse_ac)
+        row_btns.addWidget(self.btn_pause)
         row_btns.addWidget(self.btn_stop)
         root.addLayout(row_btns)
 
@@ -307,6 +546,15 @@ class PageAutoClickers(QWidget):
     def _toggle_reps(self, state):
         self.spin_reps.setEnabled(not self.chk_infinite.isChecked())
 
+    def _toggle_turbo(self, state):
+        turbo = self.chk_turbo.isChecked()
+        self.spin_cps.setEnabled(turbo)
+        self.spin_burst.setEnabled(turbo)
+        self.slider_speed.setEnabled(not turbo)
+
+    def set_turbo_stats(self, cps: float, jitter: float):
+        self.lbl_turbo_stats.setText(f"Alcançado: {cps:.1f} CPS | jitter {jitter * 1e6:.0f}µs")
+
     def get_selected_keys(self) -> List[Any]:
         keys = []
         text = self.input_keys.text().strip()
@@ -326,6 +574,15 @@ class PageAutoClickers(QWidget):
     def get_reps(self) -> int:
         return self.spin_reps.value()
 
+    def is_turbo(self) -> bool:
+        return self.chk_turbo.isChecked()
+
+    def get_cps(self) -> float:
+        return self.spin_cps.value()
+
+    def get_burst(self) -> int:
+        return self.spin_burst.value()
+
     def get_mouse_button(self) -> MouseButton:
         button_name = self.combo_mouse_button.currentText()
         return MouseButton.left if button_name == "Esquerdo" else MouseButton.right if button_name == "Direito" else MouseButton.middle
@@ -345,6 +602,12 @@ class PageAutoClickers(QWidget):
         except Exception:
             pass
         self.combo_mouse_button.setCurrentText(cfg.get("mouse_button", "Esquerdo"))
+        self.chk_turbo.setChecked(bool(cfg.get("turbo", False)))
+        try:
+            self.spin_cps.setValue(float(cfg.get("turbo_cps", 100.0)))
+            self.spin_burst.setValue(int(cfg.get("turbo_burst", 1)))
+        except Exception:
+            pass
 
     def to_config(self) -> dict:
         return {
@@ -353,7 +616,10 @@ class PageAutoClickers(QWidget):
             "velocidade": self.get_delay(),
             "modo_infinito": self.is_infinite(),
             "repeticoes": self.get_reps(),
-            "mouse_button": self.combo_mouse_button.currentText()
+            "mouse_button": self.combo_mouse_button.currentText(),
+            "turbo": self.is_turbo(),
+            "turbo_cps": self.get_cps(),
+            "turbo_burst": self.get_burst(),
         }
 
 
@@ -390,15 +656,30 @@ class PageMacros(QWidget):
         self.btn_play_teclado = QPushButton("▶ Executar Macro (F8)")
         self.btn_play_teclado.setObjectName("startButton")
         self.btn_clear_teclado = QPushButton("❌ Limpar Macro")
+        self.btn_fold_teclado = QPushButton("↻ Dobrar Repetições")
+        self.btn_fold_teclado.setToolTip("Troca trechos repetidos por um laço com contador")
         row_teclado_play.addWidget(self.btn_play_teclado)
         row_teclado_play.addWidget(self.btn_clear_teclado)
+        row_teclado_play.addWidget(self.btn_fold_teclado)
         teclado_layout.addLayout(row_teclado_play)
 
-        self.txt_macro_teclado = QTextEdit()
-        self.txt_macro_teclado.setReadOnly(True)
-        self.txt_macro_teclado.setPlaceholderText("Sua macro de teclado aparecerá aqui...")
-        self.txt_macro_teclado.setMinimumHeight(160)
-        teclado_layout.addWidget(self.txt_macro_teclado)
+        # Modo misto: teclado e mouse numa única gravação, reproduzidos por um só plano
+        self.chk_rec_misto = QCheckBox("Gravar mouse junto (mesma linha do tempo)")
+        teclado_layout.addWidget(self.chk_rec_misto)
+
+        # Arquivos binários (.acm): exportar/abrir a macro atual ou reproduzir direto do disco
+        row_teclado_file = QHBoxLayout()
+        self.btn_file_export = QPushButton("💾 Exportar .acm")
+        self.btn_file_open = QPushButton("📂 Abrir .acm")
+        self.btn_file_play = QPushButton("▶ Executar .acm")
+        row_teclado_file.addWidget(self.btn_file_export)
+        row_teclado_file.addWidget(self.btn_file_open)
+        row_teclado_file.addWidget(self.btn_file_play)
+        teclado_layout.addLayout(row_teclado_file)
+
+        self.model_macro_teclado = MacroListModel(fmt_macro_line, self)
+        self.list_macro_teclado = make_macro_view(self.model_macro_teclado)
+        teclado_layout.addWidget(self.list_macro_teclado)
 
         # Seção de perfis de teclado
         profiles_frame = QFrame()
@@ -443,37 +724,154 @@ class PageMacros(QWidget):
         self.btn_play_mouse = QPushButton("▶ Executar Macro")
         self.btn_play_mouse.setObjectName("startButton")
         self.btn_clear_mouse = QPushButton("❌ Limpar Macro")
+        self.btn_fold_mouse = QPushButton("↻ Dobrar Repetições")
+        self.btn_fold_mouse.setToolTip("Troca trechos repetidos por um laço com contador")
         row_mouse_play.addWidget(self.btn_play_mouse)
         row_mouse_play.addWidget(self.btn_clear_mouse)
+        row_mouse_play.addWidget(self.btn_fold_mouse)
         mouse_layout.addLayout(row_mouse_play)
         
-        self.lbl_mouse_pos = QLabel("Posição atual: (0, 0)")
-        self.lbl_mouse_pos.setStyleSheet("color: #a0a0b0; font-size: 16px; font-weight: bold;")
-        self.lbl_mouse_pos.setAlignment(Qt.AlignCenter)
-        mouse_layout.addWidget(self.lbl_mouse_pos)
+        self.input_panel = InputTelemetryPanel(input_monitor)
+        mouse_layout.addWidget(self.input_panel)
 
-        self.txt_macro_mouse = QTextEdit()
-        self.txt_macro_mouse.setReadOnly(True)
-        self.txt_macro_mouse.setPlaceholderText("Sua macro do mouse aparecerá aqui...")
-        self.txt_macro_mouse.setMinimumHeight(160)
-        mouse_layout.addWidget(self.txt_macro_mouse)
+        self.model_macro_mouse = MacroListModel(fmt_macro_line, self)
+        self.list_macro_mouse = make_macro_view(self.model_macro_mouse)
+        mouse_layout.addWidget(self.list_macro_mouse)
 
         grid_layout.addWidget(mouse_frame, 0, 1, 1, 1)
 
         root.addLayout(grid_layout)
+
+        # Velocidade de reprodução: vale para as duas macros e para os arquivos .acm
+        speed_frame = QFrame()
+        speed_frame.setObjectName("sectionFrame")
+        speed_layout = QVBoxLayout(speed_frame)
+        speed_layout.addWidget(QLabel("Velocidade de Reprodução:"))
+        defaults = ReplaySpeed()
+        row_speed = QHBoxLayout()
+        row_speed.addWidget(QLabel("Multiplicador:"))
+        self.spin_replay_speed = QDoubleSpinBox()
+        self.spin_replay_speed.setRange(SPEED_MIN, SPEED_MAX)
+        self.spin_replay_speed.setDecimals(2)
+        self.spin_replay_speed.setSingleStep(0.1)
+        self.spin_replay_speed.setSuffix("x")
+        self.spin_replay_speed.setValue(defaults.factor)
+        row_speed.addWidget(self.spin_replay_speed)
+        self.chk_compress_idle = QCheckBox("O mais rápido possível")
+        row_speed.addWidget(self.chk_compress_idle)
+        row_speed.addWidget(QLabel("Pausas acima de (ms):"))
+        self.spin_idle_threshold = QSpinBox()
+        self.spin_idle_threshold.setRange(1, 600000)
+        self.spin_idle_threshold.setValue(int(defaults.idle_threshold * 1000))
+        row_speed.addWidget(self.spin_idle_threshold)
+        row_speed.addWidget(QLabel("Intervalo mín. (ms):"))
+        self.spin_min_gap = QDoubleSpinBox()
+        self.spin_min_gap.setRange(0.0, 1000.0)
+        self.spin_min_gap.setDecimals(1)
+        self.spin_min_gap.setValue(defaults.min_gap * 1000)
+        row_speed.addWidget(self.spin_min_gap)
+        speed_layout.addLayout(row_speed)
+        self.lbl_runtime = QLabel("Duração prevista: -")
+        self.lbl_runtime.setStyleSheet("color: #a0a0b0;")
+        speed_layout.addWidget(self.lbl_runtime)
+        self._toggle_compress(False)
+        self.chk_compress_idle.toggled.connect(self._toggle_compress)
+        root.addWidget(speed_frame)
+
+        # Script: texto compilado uma vez para a mesma Macro da gravação
+        script_frame = QFrame()
+        script_frame.setObjectName("sectionFrame")
+        script_layout = QVBoxLayout(script_frame)
+        script_layout.addWidget(QLabel("Script de Macro:"))
+        self.txt_script = QPlainTextEdit()
+        self.txt_script.setFont(QFont("Consolas", 10))
+        self.txt_script.setPlaceholderText(
+            "set passo = 50ms\n"
+            "repeat 10 {\n"
+            "    tap e\n"
+            "    click left\n"
+            "    wait $passo\n"
+            "}\n"
+            "# press/release/tap TECLA, click [left|right|middle] [vezes], move X Y, scroll N, wait 1.5s"
+        )
+        self.txt_script.setMinimumHeight(120)
+        script_layout.addWidget(self.txt_script)
+        row_script = QHBoxLayout()
+        self.btn_script_compile = QPushButton("✔ Compilar")
+        self.btn_script_play = QPushButton("▶ Executar Script")
+        self.btn_script_play.setObjectName("startButton")
+        self.btn_script_to_macro = QPushButton("⇩ Usar como Macro de Teclado")
+        row_script.addWidget(self.btn_script_compile)
+        row_script.addWidget(self.btn_script_play)
+        row_script.addWidget(self.btn_script_to_macro)
+        script_layout.addLayout(row_script)
+        self.lbl_script = QLabel("")
+        self.lbl_script.setWordWrap(True)
+        self.lbl_script.setStyleSheet("color: #a0a0b0;")
+        script_layout.addWidget(self.lbl_script)
+        root.addWidget(script_frame)
+
         root.addStretch()
 
-    def set_macro_text_teclado(self, text: str):
-        self.txt_macro_teclado.setPlainText(text)
+    def _toggle_compress(self, on: bool):
+        self.spin_idle_threshold.setEnabled(on)
+
+    def get_replay_speed(self) -> ReplaySpeed:
+        return ReplaySpeed(
+            factor=self.spin_replay_speed.value(),
+            compress_idle=self.chk_compress_idle.isChecked(),
+            idle_threshold=self.spin_idle_threshold.value() / 1000.0,
+            min_gap=self.spin_min_gap.value() / 1000.0,
+        )
+
+    def set_replay_speed(self, sp: ReplaySpeed):
+        self.spin_replay_speed.setValue(sp.factor)
+        self.chk_compress_idle.setChecked(sp.compress_idle)
+        self.spin_idle_threshold.setValue(int(sp.idle_threshold * 1000))
+        self.spin_min_gap.setValue(sp.min_gap * 1000)
+
+    def set_runtime_preview(self, teclado: float, mouse: float, reps: Optional[int]):
+        def fmt(seg: float) -> str:
+            return f"{seg:.2f}s" if seg < 120 else f"{seg / 60:.1f}min"
+        texto = f"Duração prevista por repetição: teclado {fmt(teclado)} · mouse {fmt(mouse)}"
+        if reps is not None and reps > 1:
+            texto += f"  (×{reps}: {fmt(teclado * reps)} · {fmt(mouse * reps)})"
+        self.lbl_runtime.setText(texto)
+
+    def is_rec_misto(self) -> bool:
+        return self.chk_rec_misto.isChecked()
+
+    def set_macro_teclado(self, macro: Macro):
+        self.model_macro_teclado.set_macro(macro)
     
-    def set_macro_text_mouse(self, text: str):
-        self.txt_macro_mouse.setPlainText(text)
+    def set_macro_mouse(self, macro: Macro):
+        self.model_macro_mouse.set_macro(macro)
 
-    def refresh_profiles(self, profiles: Dict[str, Any]):
+    def refresh_profiles(self, names: List[str]):
         self.combo_profiles.clear()
-        names = sorted(profiles.keys())
         self.combo_profiles.addItems(names)
 
+    def get_script(self) -> str:
+        return self.txt_script.toPlainText()
+
+    def set_script(self, text: str):
+        self.txt_script.setPlainText(text)
+
+    def show_script_info(self, text: str):
+        self.lbl_script.setStyleSheet("color: #a0a0b0;")
+        self.lbl_script.setText(text)
+
+    def show_script_errors(self, errors: List[Tuple[int, str]]):
+        # Lista os erros e leva o cursor para a primeira linha com problema
+        self.lbl_script.setStyleSheet("color: #ff6b6b;")
+        self.lbl_script.setText("\n".join(f"Linha {n}: {msg}" for n, msg in errors))
+        bloco = self.txt_script.document().findBlockByNumber(errors[0][0] - 1)
+        if bloco.isValid():
+            cursor = QTextCursor(bloco)
+            cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
+            self.txt_script.setTextCursor(cursor)
+            self.txt_script.setFocus()
+
 
 class PageSettings(QWidget):
     def __init__(self):
@@ -501,6 +899,31 @@ class PageSettings(QWidget):
         general_layout.addLayout(row1)
         root.addWidget(general_frame)
 
+        filter_frame = QFrame()
+        filter_frame.setObjectName("sectionFrame")
+        filter_layout = QVBoxLayout(filter_frame)
+        filter_layout.addWidget(QLabel("Filtro de Gravação do Mouse:"))
+        defaults = MoveFilter()
+        row_filter = QHBoxLayout()
+        row_filter.addWidget(QLabel("Intervalo mín. (ms):"))
+        self.spin_move_interval = QSpinBox()
+        self.spin_move_interval.setRange(0, 1000)
+        self.spin_move_interval.setValue(int(defaults.min_interval * 1000))
+        row_filter.addWidget(self.spin_move_interval)
+        row_filter.addWidget(QLabel("Distância mín. (px):"))
+        self.spin_move_distance = QSpinBox()
+        self.spin_move_distance.setRange(0, 500)
+        self.spin_move_distance.setValue(int(defaults.min_distance))
+        row_filter.addWidget(self.spin_move_distance)
+        row_filter.addWidget(QLabel("Tolerância do caminho (px):"))
+        self.spin_rdp_tolerance = QDoubleSpinBox()
+        self.spin_rdp_tolerance.setRange(0.0, 50.0)
+        self.spin_rdp_tolerance.setSingleStep(0.5)
+        self.spin_rdp_tolerance.setValue(defaults.rdp_tolerance)
+        row_filter.addWidget(self.spin_rdp_tolerance)
+        filter_layout.addLayout(row_filter)
+        root.addWidget(filter_frame)
+
         profiles_frame = QFrame()
         profiles_frame.setObjectName("sectionFrame")
         profiles_layout = QVBoxLayout(profiles_frame)
@@ -515,6 +938,54 @@ class PageSettings(QWidget):
 
         root.addStretch()
 
+    def get_move_filter(self) -> MoveFilter:
+        return MoveFilter(
+            min_interval=self.spin_move_interval.value() / 1000.0,
+            min_distance=float(self.spin_move_distance.value()),
+            rdp_tolerance=self.spin_rdp_tolerance.value(),
+        )
+
+    def set_move_filter(self, f: MoveFilter):
+        self.spin_move_interval.setValue(int(f.min_interval * 1000))
+        self.spin_move_distance.setValue(int(f.min_distance))
+        self.spin_rdp_tolerance.setValue(f.rdp_tolerance)
+
+
+# ----- Velocidade de reprodução <-> configuração
+def replay_speed_from_config(cfg: dict) -> ReplaySpeed:
+    defaults = ReplaySpeed()
+    return ReplaySpeed(
+        factor=min(SPEED_MAX, max(SPEED_MIN, float(cfg.get("fator", defaults.factor)))),
+        compress_idle=bool(cfg.get("o_mais_rapido", defaults.compress_idle)),
+        idle_threshold=float(cfg.get("limite_pausa", defaults.idle_threshold)),
+        min_gap=float(cfg.get("intervalo_min", defaults.min_gap)),
+    )
+
+def replay_speed_to_config(sp: ReplaySpeed) -> dict:
+    return {
+        "fator": sp.factor,
+        "o_mais_rapido": sp.compress_idle,
+        "limite_pausa": sp.idle_threshold,
+        "intervalo_min": sp.min_gap,
+    }
+
+
+# ----- Filtro de movimentos <-> configuração (a página pode nem ter sido criada)
+def move_filter_from_config(cfg: dict) -> MoveFilter:
+    defaults = MoveFilter()
+    return MoveFilter(
+        min_interval=float(cfg.get("intervalo_min", defaults.min_interval)),
+        min_distance=float(cfg.get("distancia_min", defaults.min_distance)),
+        rdp_tolerance=float(cfg.get("tolerancia_caminho", defaults.rdp_tolerance)),
+    )
+
+def move_filter_to_config(f: MoveFilter) -> dict:
+    return {
+        "intervalo_min": f.min_interval,
+        "distancia_min": f.min_distance,
+        "tolerancia_caminho": f.rdp_tolerance,
+    }
+
 
 class PageAbout(QWidget):
     def __init__(self):
@@ -532,14 +1003,17 @@ class PageAbout(QWidget):
         txt.setPlainText(
             "📖 **Como usar:**\n"
             "1) **Página Auto Clickers:** digite teclas normais (ex.: wasd) e/ou selecione especiais, ajuste delay e repetições para o autoclicker de teclado. Use o seletor de botão para o autoclicker de mouse.\n"
-            "   - Iniciar Auto Clicker Teclado: botão ou tecla **F6**.\n"
-            "   - Iniciar Auto Clicker Mouse: botão ou tecla **F7**.\n"
+            "   - Iniciar/parar Auto Clicker Teclado: botão ou tecla **F6**.\n"
+            "   - Iniciar/parar Auto Clicker Mouse: botão ou tecla **F7**.\n"
+            "   - Auto clickers e macros rodam ao mesmo tempo (ex.: tecla a cada 50 ms + mouse a 20 CPS + macro em laço); cada botão inicia ou para só o seu.\n"
             "   - Parar tudo: botões ou tecla **F9**.\n"
+            "   - **Modo turbo:** defina a meta em cliques por segundo (acima de 1000 CPS) e quantos cliques enviar por ciclo; o CPS alcançado e o jitter aparecem ao lado.\n"
             "2) **Página Macros:** grave sequências de teclado ou mouse, com movimentos e cliques. `ESC` para parar a gravação.\n"
             "   - **Atenção:** A gravação do mouse é sensível, evite movimentos bruscos e desnecessários.\n"
             "   - **Capturar Posição:** Use o atalho **Ctrl+Shift+C** para adicionar uma posição fixa à sua macro de mouse.\n"
             "   - Executar Macro Teclado: botão ou tecla **F8**.\n"
             "   - Executar Macro Mouse: botão dedicado.\n"
+            "   - **Script de Macro:** escreva comandos (press/release/tap, click, move, scroll, wait, repeat N { }, set nome = valor e $nome) e use Compilar, Executar Script ou Usar como Macro de Teclado; erros aparecem com o número da linha.\n"
             "3) **Perfis:** salve a macro de teclado atual com um nome. Carregue/exclua pelo seletor.\n"
             "4) **Configurações:** salve/carregue config geral e exporte/importe perfis.\n\n"
             "⚠ **Observações:**\n"
@@ -547,11 +1021,14 @@ class PageAbout(QWidget):
             "- Alguns apps/jogos podem bloquear automação.\n"
             "- Use por sua conta e risco; verifique termos de uso do software-alvo.\n\n"
             "**Atalhos globais:**\n"
-            "- **F6:** iniciar Auto Clicker de Teclado\n"
-            "- **F7:** iniciar Auto Clicker de Mouse\n"
-            "- **F8:** executar Macro de Teclado\n"
+            "- **F6:** iniciar/parar Auto Clicker de Teclado\n"
+            "- **F7:** iniciar/parar Auto Clicker de Mouse\n"
+            "- **F8:** executar/parar Macro de Teclado\n"
             "- **F9:** parar tudo\n"
             "- **ESC:** parar gravação de macro de teclado ou mouse\n"
+            "- Os atalhos podem ser trocados em \"atalhos\" no arquivo de configuração "
+            "(ex.: \"alt+f9\": \"parar_tudo\"; ações: auto_teclado, auto_mouse, macro_teclado, "
+            "macro_mouse, macro_script, pausar, parar_tudo, capturar_posicao).\n"
         )
         root.addWidget(txt)
         root.addStretch()
@@ -594,13 +1071,12 @@ class MainWindow(QMainWindow):
         vside.addWidget(self.lbl_status)
         vside.addWidget(self.lbl_counter)
 
+        # Só a página inicial é criada agora; as outras na primeira navegação
         self.pages = QStackedWidget()
-        self.page_auto = PageAutoClickers()
-        self.page_macro = PageMacros()
-        self.page_settings = PageSettings()
-        self.page_about = PageAbout()
-        for p in [self.page_auto, self.page_macro, self.page_settings, self.page_about]:
-            self.pages.addWidget(p)
+        self._pages: Dict[str, QWidget] = {}
+        self._page_types = {"auto": PageAutoClickers, "macro": PageMacros,
+                            "settings": PageSettings, "about": PageAbout}
+        self.profiles = ProfileStore(PROFILES_DIR)
 
         central = QWidget()
         root = QHBoxLayout(central)
@@ -614,321 +1090,640 @@ class MainWindow(QMainWindow):
         self.btn_go_settings.clicked.connect(lambda: self.pages.setCurrentWidget(self.page_settings))
         self.btn_go_about.clicked.connect(lambda: self.pages.setCurrentWidget(self.page_about))
 
-        bus.status.connect(self.on_status)
-        bus.counter.connect(self.on_counter)
-        bus.macro_teclado_text.connect(self.page_macro.set_macro_text_teclado)
-        bus.macro_mouse_text.connect(self.page_macro.set_macro_text_mouse)
-
-        # Autoclickers
-        self.page_auto.btn_start_keyboard_ac.clicked.connect(lambda: threading.Thread(target=self.start_auto_click_teclado, daemon=True).start())
-        self.page_auto.btn_start_mouse_ac.clicked.connect(lambda: threading.Thread(target=self.start_auto_click_mouse, daemon=True).start())
-        self.page_auto.btn_stop.clicked.connect(self.stop_all)
-        
-        # Macros
-        self.page_macro.btn_rec_teclado.clicked.connect(self.start_record_teclado)
-        self.page_macro.btn_stop_rec_teclado.clicked.connect(self.stop_record_teclado)
-        self.page_macro.btn_play_teclado.clicked.connect(lambda: threading.Thread(target=self.start_macro_teclado, daemon=True).start())
-        self.page_macro.btn_clear_teclado.clicked.connect(self.clear_current_macro_teclado)
+        bus.hotkey.connect(self._on_hotkey)
+        bus.config_loaded.connect(self._apply_config)
+        bus.profiles_loaded.connect(self._on_profiles_loaded)
+        bus.macro_folded.connect(self._on_macro_folded)
+        bus.runtime_estimated.connect(self._on_runtime_estimated)
+        bus.script_compiled.connect(self._on_script_compiled)
+        jobs.on_finished = self._on_job_finished
+        self.pages.setCurrentWidget(self.page_auto)
+
+        self._telemetry_version = -1
+        self._counter_text = "0"
+        self._script_text = ""  # texto do script (guardado mesmo sem a página criada)
+        self._script_cache: Optional[Tuple[str, Macro]] = None  # último texto compilado
+        self._compiling = False  # uma compilação de script em segundo plano por vez
+        self._folding = False  # uma dobra de laços em segundo plano por vez
+        # Prévia da duração: uma estimativa em segundo plano por vez, a última guardada
+        self._preview_busy = False
+        self._preview_pending = False
+        self._preview_cache: Optional[Tuple[tuple, float, float]] = None
+        self.telemetry_timer = QTimer(self)
+        self.telemetry_timer.setInterval(1000 // TELEMETRY_HZ)
+        self.telemetry_timer.timeout.connect(self._poll_telemetry)
+        self.telemetry_timer.start()
+
+        # Config e índice de perfis são lidos fora da thread da UI; os
+        # listeners sobem depois que a janela aparece
+        threading.Thread(target=self._load_in_background, name="startup-load", daemon=True).start()
+        QTimer.singleShot(0, self.start_global_listeners)
+
+    # ===== Páginas sob demanda
+    def _page(self, name: str) -> QWidget:
+        page = self._pages.get(name)
+        if page is None:
+            page = self._pages[name] = self._page_types[name]()
+            self.pages.addWidget(page)
+            wire = getattr(self, f"_wire_{name}", None)
+            if wire is not None:
+                wire(page)
+        return page
+
+    def _has_page(self, name: str) -> bool:
+        return name in self._pages
+
+    @property
+    def page_auto(self) -> PageAutoClickers:
+        return self._page("auto")
+
+    @property
+    def page_macro(self) -> PageMacros:
+        return self._page("macro")
+
+    @property
+    def page_settings(self) -> PageSettings:
+        return self._page("settings")
+
+    @property
+    def page_about(self) -> PageAbout:
+        return self._page("about")
+
+    def _wire_auto(self, page: PageAutoClickers):
+        page.btn_start_keyboard_ac.clicked.connect(self.start_auto_click_teclado)
+        page.btn_start_mouse_ac.clicked.connect(self.start_auto_click_mouse)
+        page.btn_pause.clicked.connect(self.toggle_pause)
+        page.btn_stop.clicked.connect(self.stop_all)
+
+    def _wire_macro(self, page: PageMacros):
+        page.btn_rec_teclado.clicked.connect(self.start_record_teclado)
+        page.btn_stop_rec_teclado.clicked.connect(self.stop_record_teclado)
+        page.btn_play_teclado.clicked.connect(self.start_macro_teclado)
+        page.btn_clear_teclado.clicked.connect(self.clear_current_macro_teclado)
+        page.btn_fold_teclado.clicked.connect(self.fold_macro_teclado)
         
-        self.page_macro.btn_rec_mouse.clicked.connect(self.start_record_mouse)
-        self.page_macro.btn_stop_rec_mouse.clicked.connect(self.stop_record_mouse)
-        self.page_macro.btn_play_mouse.clicked.connect(lambda: threading.Thread(target=self.start_macro_mouse, daemon=True).start())
-        self.page_macro.btn_clear_mouse.clicked.connect(self.clear_current_macro_mouse)
+        page.btn_rec_mouse.clicked.connect(self.start_record_mouse)
+        page.btn_stop_rec_mouse.clicked.connect(self.stop_record_mouse)
+        page.btn_play_mouse.clicked.connect(self.start_macro_mouse)
+        page.btn_clear_mouse.clicked.connect(self.clear_current_macro_mouse)
+        page.btn_fold_mouse.clicked.connect(self.fold_macro_mouse)
         
-        self.page_macro.btn_profile_save.clicked.connect(self.save_profile)
-        self.page_macro.btn_profile_load.clicked.connect(self.load_profile)
-        self.page_macro.btn_profile_delete.clicked.connect(self.delete_profile)
-
-        self.page_settings.btn_save_cfg.clicked.connect(self.save_config)
-        self.page_settings.btn_load_cfg.clicked.connect(self.load_config)
-        self.page_settings.btn_delete_cfg.clicked.connect(self.delete_config)
-        self.page_settings.btn_export_profiles.clicked.connect(self.export_profiles)
-        self.page_settings.btn_import_profiles.clicked.connect(self.import_profiles)
-
-        self.load_config(silent=True)
-        self.load_profiles()
-        self.start_global_listener_and_cursor_tracker()
-
-    def start_global_listener_and_cursor_tracker(self):
+        page.btn_file_export.clicked.connect(self.export_macro_file)
+        page.btn_file_open.clicked.connect(self.open_macro_file)
+        page.btn_file_play.clicked.connect(self.play_macro_file)
+
+        page.btn_profile_save.clicked.connect(self.save_profile)
+        page.btn_profile_load.clicked.connect(self.load_profile)
+        page.btn_profile_delete.clicked.connect(self.delete_profile)
+
+        page.btn_script_compile.clicked.connect(self.check_script)
+        page.btn_script_play.clicked.connect(self.run_script)
+        page.btn_script_to_macro.clicked.connect(self.script_to_macro)
+
+        # Estado atual na criação; a partir daqui, os sinais mantêm a página em dia
+        page.set_script(self._script_text)
+        page.set_macro_teclado(macro_gravado_teclado)
+        page.set_macro_mouse(macro_gravado_mouse)
+        page.refresh_profiles(self.profiles.names())
+        bus.macro_teclado_changed.connect(page.set_macro_teclado)
+        bus.macro_mouse_changed.connect(page.set_macro_mouse)
+
+        # Prévia da duração: recalculada com atraso curto (macros grandes + spin contínuo)
+        page.set_replay_speed(replay_speed)
+        for w in [page.spin_replay_speed, page.spin_idle_threshold, page.spin_min_gap]:
+            w.valueChanged.connect(self._apply_replay_speed)
+        page.chk_compress_idle.toggled.connect(self._apply_replay_speed)
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.timeout.connect(self._update_runtime_preview)
+        bus.macro_teclado_changed.connect(self._schedule_runtime_preview)
+        bus.macro_mouse_changed.connect(self._schedule_runtime_preview)
+        self.page_auto.spin_reps.valueChanged.connect(self._schedule_runtime_preview)
+        self.page_auto.chk_infinite.toggled.connect(self._schedule_runtime_preview)
+        self._update_runtime_preview()
+
+    def _wire_settings(self, page: PageSettings):
+        page.btn_save_cfg.clicked.connect(self.save_config)
+        page.btn_load_cfg.clicked.connect(self.load_config)
+        page.btn_delete_cfg.clicked.connect(self.delete_config)
+        page.btn_export_profiles.clicked.connect(self.export_profiles)
+        page.btn_import_profiles.clicked.connect(self.import_profiles)
+        page.set_move_filter(move_filter.cfg)
+        for spin in [page.spin_move_interval, page.spin_move_distance, page.spin_rdp_tolerance]:
+            spin.valueChanged.connect(self._apply_move_filter)
+
+    # ===== Carga inicial em segundo plano
+    def _load_in_background(self):
+        # Só I/O e parsing aqui; widgets são tocados em _apply_config/_on_profiles_loaded
+        try:
+            bus.config_loaded.emit(read_config())
+        except Exception as e:
+            print(f"Aviso: configuração não carregada ({e}).")
+        store = ProfileStore(PROFILES_DIR, self.profiles.cache)
+        erro = ""
+        try:
+            store.load()
+            if os.path.exists(PROFILES_FILE):
+                n = store.migrate_json(PROFILES_FILE)
+                set_status(f"{n} perfis migrados para {PROFILES_DIR}/.")
+        except (OSError, ValueError) as e:
+            # Índice corrompido: load() já guardou uma cópia e reconstruiu a
+            # partir dos .acm. Sem leitura (OSError) loaded fica False e
+            # nenhuma escrita substitui o índice que está no disco.
+            erro = str(e)
+        bus.profiles_loaded.emit((store, erro))
+
+    def start_global_listeners(self):
         global gravando, gravando_mouse
         gravando = False
         gravando_mouse = False
-        self.keyboard_listener, self.mouse_listener = start_global_listener(self)
+        self.keyboard_listener, self.mouse_listener, self.recorder = start_global_listener(self)
+        startup_mark("listeners ativos")
 
-        self.mouse_pos_timer = QTimer(self)
-        self.mouse_pos_timer.setInterval(100)  # 100ms
-        self.mouse_pos_timer.timeout.connect(self._update_mouse_pos)
-        self.mouse_pos_timer.start()
+    def _hotkey_actions(self) -> Dict[str, Any]:
+        # Ações que um atalho pode disparar (capturar_posicao é tratada no consumidor)
+        return {
+            "auto_teclado": self.start_auto_click_teclado,
+            "auto_mouse": self.start_auto_click_mouse,
+            "macro_teclado": self.start_macro_teclado,
+            "macro_mouse": self.start_macro_mouse,
+            "macro_script": self.run_script,
+            "pausar": self.toggle_pause,
+            "parar_tudo": self.stop_all,
+        }
 
-    def _update_mouse_pos(self):
-        x, y = QCursor.pos().x(), QCursor.pos().y()
-        self.page_macro.lbl_mouse_pos.setText(f"Posição atual: ({x}, {y})")
+    def _on_hotkey(self, name: str):
+        action = self._hotkey_actions().get(name)
+        if action is not None:
+            action()
+
+    def _apply_replay_speed(self, *_):
+        global replay_speed
+        replay_speed = self.page_macro.get_replay_speed()
+        self._schedule_runtime_preview()
+
+    def _schedule_runtime_preview(self, *_):
+        self._preview_timer.start()
+
+    def _update_runtime_preview(self):
+        # Com compress_idle ou min_gap a estimativa percorre a macro desdobrada
+        # inteira: roda fora da thread da UI e o resultado volta por
+        # bus.runtime_estimated. Mesma macro e velocidade reaproveitam o último.
+        teclado, mouse, speed = macro_gravado_teclado, macro_gravado_mouse, replay_speed
+        chave = (id(teclado), len(teclado), teclado.end_ns, id(mouse), len(mouse), mouse.end_ns, speed)
+        if self._preview_cache is not None and self._preview_cache[0] == chave:
+            self._show_runtime_preview(*self._preview_cache[1:])
+            return
+        if self._preview_busy:
+            self._preview_pending = True  # recalcula quando a atual terminar
+            return
+        self._preview_busy = True
 
-    def capture_mouse_position(self):
-        global macro_gravado_mouse
-        x, y = QCursor.pos().x(), QCursor.pos().y()
+        def worker():
+            try:
+                duracoes = (estimate_runtime(teclado, speed), estimate_runtime(mouse, speed))
+            except Exception as e:
+                print(f"Aviso: duração prevista indisponível ({e}).")
+                duracoes = None
+            bus.runtime_estimated.emit((chave, duracoes))
+
+        threading.Thread(target=worker, name="runtime-preview", daemon=True).start()
+
+    def _on_runtime_estimated(self, result: Tuple[tuple, Optional[Tuple[float, float]]]):
+        chave, duracoes = result
+        self._preview_busy = False
+        if duracoes is not None:
+            self._preview_cache = (chave,) + duracoes
+        if self._preview_pending:
+            self._preview_pending = False
+            self._update_runtime_preview()  # macro ou velocidade mudaram no meio
+        elif duracoes is not None:
+            self._show_runtime_preview(*duracoes)
+
+    def _show_runtime_preview(self, teclado: float, mouse: float):
+        reps = None if self.page_auto.is_infinite() else self.page_auto.get_reps()
+        self.page_macro.set_runtime_preview(teclado, mouse, reps)
+
+    def _apply_move_filter(self, *_):
+        move_filter.cfg = self.page_settings.get_move_filter()
+
+    def capture_mouse_position(self, x: int, y: int):
+        # Chamado pelo consumidor dos rings (nunca pela UI): a posição vem do listener
+        m = macro_gravado_teclado if gravando_misto else macro_gravado_mouse
         # Tempo de espera de 0s, pois é uma posição fixa
-        macro_gravado_mouse.append(("position", (x, y), 0.0)) 
-        set_macro_text_mouse(macro_gravado_mouse)
+        m.append(OP_POSITION, m.end_ns, x, y)
         set_status(f"Posição ({x}, {y}) capturada.")
         
-    # ===== Ações (executadas em thread quando necessário)
+    # ===== Ações (jobs multiplexados pelo JobScheduler: vários ao mesmo tempo)
+    def _start_job(self, job: Job) -> bool:
+        # Cada nome é um job independente: os outros continuam rodando
+        if not jobs.start(job):
+            return False
+        set_status(f"Executando {job.name}…")
+        return True
+
     def start_auto_click_teclado(self):
-        global executando, contador
-        if executando: return
+        if jobs.stop(JOB_AUTO_TECLADO): return  # botão/atalho alterna o próprio job
         keys = self.page_auto.get_selected_keys()
         if not keys:
             set_status("Nenhuma tecla selecionada.")
             return
-        executando = True
-        contador = 0
-        set_counter(contador)
-        set_status("Executando Auto Clicker (Teclado)…")
-        delay = self.page_auto.get_delay()
-        infinite = self.page_auto.is_infinite()
-        reps = self.page_auto.get_reps()
-        def worker():
-            global executando, contador
-            try:
-                if infinite:
-                    while executando:
-                        for t in keys: keyboard.press(t)
-                        for t in reversed(keys): keyboard.release(t)
-                        contador += 1
-                        set_counter(contador)
-                        time.sleep(delay)
-                else:
-                    for _ in range(reps):
-                        if not executando: break
-                        for t in keys: keyboard.press(t)
-                        for t in reversed(keys): keyboard.release(t)
-                        contador += 1
-                        set_counter(contador)
-                        time.sleep(delay)
-            finally:
-                if executando:
-                    set_status("Pronto")
-        threading.Thread(target=worker, daemon=True).start()
+        def press_all():
+            for t in keys: backend.press(t)
+            for t in reversed(keys): backend.release(t)
+        self._start_auto_click(JOB_AUTO_TECLADO, press_all)
 
     def start_auto_click_mouse(self):
-        global executando, contador
-        if executando: return
+        if jobs.stop(JOB_AUTO_MOUSE): return
         button = self.page_auto.get_mouse_button()
-        delay = self.page_auto.get_delay()
-        infinite = self.page_auto.is_infinite()
-        reps = self.page_auto.get_reps()
-        executando = True
-        contador = 0
-        set_counter(contador)
-        set_status("Executando Auto Clicker (Mouse)…")
-        def worker():
-            global executando, contador
-            try:
-                if infinite:
-                    while executando:
-                        mouse.click(button)
-                        contador += 1
-                        set_counter(contador)
-                        time.sleep(delay)
-                else:
-                    for _ in range(reps):
-                        if not executando: break
-                        mouse.click(button)
-                        contador += 1
-                        set_counter(contador)
-                        time.sleep(delay)
-            finally:
-                if executando:
-                    set_status("Pronto")
-        threading.Thread(target=worker, daemon=True).start()
-    
+        self._start_auto_click(JOB_AUTO_MOUSE, partial(backend.click, button))
+
+    def _start_auto_click(self, name: str, action):
+        # Turbo: "burst" cliques por despertar na meta de CPS; normal: um clique a cada delay
+        if self.page_auto.is_turbo():
+            burst = self.page_auto.get_burst()
+            interval = burst / self.page_auto.get_cps()
+        else:
+            burst, interval = 1, self.page_auto.get_delay()
+        total = None if self.page_auto.is_infinite() else self.page_auto.get_reps()
+        self._start_job(PacedJob(name, action, interval, burst, total))
+
+    def toggle_pause(self):
+        pausou = jobs.toggle_pause()
+        if pausou:
+            set_status("Pausado")
+        elif pausou is not None:
+            set_status("Executando " + ", ".join(job.name for job in jobs.active()) + "…")
+
     def stop_all(self):
-        global executando, gravando, gravando_mouse
-        executando = False
+        global gravando, gravando_mouse
+        parados = jobs.stop_all()  # o status com a latência vem de _on_job_finished
         gravando = False
-        gravando_mouse = False
-        set_status("Parado")
+        if gravando_misto:
+            self._finish_record_misto()
+        if gravando_mouse:
+            gravando_mouse = False
+            self._finish_record_mouse()
+        if not parados:
+            set_status("Parado")
+
+    def _on_job_finished(self, job: Job):
+        # Chamado pelo thread do JobScheduler: só escreve na telemetria
+        if job.error is not None:
+            set_status(f"{job.name}: erro ({job.error})")
+        elif job.stop_latency is not None:
+            set_status(f"{job.name}: parado (parada em {job.stop_latency * 1000:.2f}ms, "
+                       f"pior {jobs.max_stop_latency * 1000:.2f}ms)")
+        elif isinstance(job, SequenceJob):
+            set_status(f"{job.name}: pronto ({job.stats.summary()})")
+        else:
+            set_status(f"{job.name}: pronto")
 
     def start_record_teclado(self):
-        global gravando, macro_gravado_teclado, ultimo_tempo
+        global gravando, gravando_misto, macro_gravado_teclado, relogio_teclado
         if gravando: return
         self.stop_all()
-        macro_gravado_teclado = []
+        macro_gravado_teclado = Macro()
+        relogio_teclado = SessionClock()
+        ring_teclado.reset_stats()
+        misto = self.page_macro.is_rec_misto()
+        if misto:
+            ring_mouse.reset_stats()
+            move_filter.break_run()
+        gravando_misto = misto
         gravando = True
-        ultimo_tempo = time.time()
-        set_macro_text_teclado(macro_gravado_teclado)
-        set_status("Gravando Macro (Teclado)... Pressione ESC para parar.")
+        set_macro_teclado(macro_gravado_teclado)
+        modo = "Teclado + Mouse" if misto else "Teclado"
+        set_status(f"Gravando Macro ({modo})... Pressione ESC para parar.")
         
     def stop_record_teclado(self):
         global gravando
         if not gravando: return
         gravando = False
-        set_status("Gravação de Teclado encerrada. Macro salva.")
+        if gravando_misto:
+            self._finish_record_misto()
+            set_status(f"Gravação de Teclado + Mouse encerrada. Macro salva. "
+                       f"(teclado {self._ring_stats(ring_teclado)}; mouse {self._ring_stats(ring_mouse)})")
+            return
+        self.recorder.drain()  # eventos ainda no ring entram antes de fechar
+        set_status(f"Gravação de Teclado encerrada. Macro salva. ({self._ring_stats(ring_teclado)})")
+
+    def _finish_record_misto(self):
+        # Fecha os dois fluxos e simplifica os movimentos; teclas, cliques e
+        # rolagens mantêm os instantes, então a ordem entre dispositivos não muda
+        global gravando_misto, macro_gravado_teclado
+        self.recorder.drain()
+        gravando_misto = False
+        macro_gravado_teclado = simplify_mouse_macro(macro_gravado_teclado, move_filter.cfg.rdp_tolerance)
+        set_macro_teclado(macro_gravado_teclado)
         
     def start_macro_teclado(self):
-        global executando, contador, macro_gravado_teclado
+        if jobs.stop(JOB_MACRO_TECLADO): return
+        if not macro_gravado_teclado:
+            set_status("Nenhuma macro de teclado gravada.")
+            return
+        # Macros mistas usam o mesmo plano: um relógio de deadlines para os dois dispositivos
+        self._start_plan(JOB_MACRO_TECLADO, macro_gravado_teclado)
+
+    def _start_plan(self, name: str, macro: Macro):
+        # Cada macro tem as próprias teclas seguradas: parar uma não solta as da outra
+        held = HeldKeys(backend.press, backend.release)
+        plan = compile_plan(macro, make_binder(backend, held), resolve_symbols(macro, backend), replay_speed)
+        self._start_sequence(name, partial(plan_steps, plan), held.release_all, held)
+
+    def _start_sequence(self, name: str, repetition, cleanup, held: HeldKeys):
+        # repetition() -> iterador de (offset, passo) de uma repetição; held
+        # solta as teclas seguradas enquanto o job estiver pausado
+        total = None if self.page_auto.is_infinite() else self.page_auto.get_reps()
+        if not self._start_job(SequenceJob(name, repetition, total, cleanup, held)):
+            cleanup()
+
+    # ----- Arquivos de macro binários (.acm)
+    def export_macro_file(self):
         if not macro_gravado_teclado:
             set_status("Nenhuma macro de teclado gravada.")
             return
-        if executando: return
-        executando = True
-        contador = 0
-        set_counter(contador)
-        set_status("Executando Macro (Teclado)…")
-        delay_factor = 1.0 # O fator de delay será ajustado pela velocidade do autoclicker
-        infinite = self.page_auto.is_infinite()
-        reps = self.page_auto.get_reps()
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar Macro", "macro.acm", "Macro binária (*.acm)")
+        if not path: return
+        try:
+            write_macro(path, macro_gravado_teclado, compress=True)
+            set_status(f"Macro exportada para: {path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Erro de Exportação", f"Erro ao exportar: {e}")
+
+    def open_macro_file(self):
+        global macro_gravado_teclado
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir Macro", "", "Macro binária (*.acm)")
+        if not path: return
+        try:
+            macro_gravado_teclado = read_macro(path)
+        except (OSError, MacroFormatError) as e:
+            QMessageBox.critical(self, "Abrir Macro", f"Erro ao abrir: {e}")
+            return
+        set_macro_teclado(macro_gravado_teclado)
+        set_status(f"Macro carregada de: {path}")
+
+    def play_macro_file(self):
+        # Reprodução em streaming: os eventos são lidos do arquivo mapeado em
+        # memória durante a execução, sem carregar a macro inteira
+        if jobs.stop(JOB_MACRO_ARQUIVO): return
+        path, _ = QFileDialog.getOpenFileName(self, "Executar Macro", "", "Macro binária (*.acm)")
+        if not path: return
+        try:
+            mf = MacroFile(path)
+        except (OSError, MacroFormatError) as e:
+            QMessageBox.critical(self, "Executar Macro", f"Erro ao abrir: {e}")
+            return
+        held = HeldKeys(backend.press, backend.release)
+        bind, objs, speed = make_binder(backend, held), resolve_symbols(mf, backend), replay_speed
+        def cleanup():
+            held.release_all()
+            mf.close()
+        self._start_sequence(JOB_MACRO_ARQUIVO, lambda: stream_steps(mf, bind, objs, speed), cleanup, held)
+
+    # ----- Scripts: compilados uma vez por texto para a mesma Macro da gravação
+    def _current_script(self) -> str:
+        if self._has_page("macro"):
+            self._script_text = self.page_macro.get_script()
+        return self._script_text
+
+    def _compile_script(self, then: Callable[[Macro], None]):
+        # Um repeat pode expandir para milhões de linhas: a compilação roda
+        # fora da thread da UI e then(macro) é chamado por bus.script_compiled.
+        # Texto igual ao da última compilação reaproveita a Macro.
+        texto = self._current_script()
+        if self._script_cache is not None and self._script_cache[0] == texto:
+            then(self._script_cache[1])
+            return
+        if self._compiling:
+            set_status("Script ainda compilando…")
+            return
+        self._compiling = True
+        set_status("Compilando script…")
+        speed = replay_speed
+
         def worker():
-            global executando, contador
             try:
-                if infinite:
-                    while executando:
-                        for tecla, acao, tempo in macro_gravado_teclado:
-                            if not executando: break
-                            time.sleep(tempo * delay_factor)
-                            if acao == "press": keyboard.press(tecla)
-                            elif acao == "release": keyboard.release(tecla)
-                        contador += 1
-                        set_counter(contador)
-                else:
-                    for _ in range(reps):
-                        if not executando: break
-                        for tecla, acao, tempo in macro_gravado_teclado:
-                            if not executando: break
-                            time.sleep(tempo * delay_factor)
-                            if acao == "press": keyboard.press(tecla)
-                            elif acao == "release": keyboard.release(tecla)
-                        contador += 1
-                        set_counter(contador)
-            finally:
-                if executando: set_status("Pronto")
-        threading.Thread(target=worker, daemon=True).start()
+                macro = compile_script(texto)
+                resumo = (f"Compilado: {len(macro)} linhas, {played_events(macro):,} eventos por repetição, "
+                          f"{estimate_runtime(macro, speed):.2f}s")
+                bus.script_compiled.emit((texto, macro, resumo, then))
+            except ScriptError as e:
+                bus.script_compiled.emit((texto, e, "", then))
+            except Exception as e:  # nunca deixa _compiling preso
+                bus.script_compiled.emit((texto, ScriptError([(1, f"falha ao compilar: {e}")]), "", then))
+
+        threading.Thread(target=worker, name="script-compile", daemon=True).start()
+
+    def _on_script_compiled(self, result: Tuple[str, Any, str, Callable[[Macro], None]]):
+        texto, macro, resumo, then = result
+        self._compiling = False
+        if isinstance(macro, ScriptError):
+            self.page_macro.show_script_errors(macro.errors)
+            set_status(f"Script com {len(macro.errors)} erro(s).")
+            return
+        self._script_cache = (texto, macro)
+        self.page_macro.show_script_info(resumo)
+        then(macro)
+
+    def check_script(self):
+        self._compile_script(lambda macro: set_status("Script compilado."))
+
+    def run_script(self):
+        if jobs.stop(JOB_MACRO_SCRIPT): return
+        self._compile_script(partial(self._start_plan, JOB_MACRO_SCRIPT))
+
+    def script_to_macro(self):
+        self._compile_script(self._use_script_as_macro)
+
+    def _use_script_as_macro(self, macro: Macro):
+        global macro_gravado_teclado
+        if gravando:
+            set_status("Pare a gravação antes de trocar a macro de teclado.")
+            return
+        macro_gravado_teclado = macro
+        set_macro_teclado(macro_gravado_teclado)
+        set_status("Script copiado para a macro de teclado.")
 
     def clear_current_macro_teclado(self):
         global macro_gravado_teclado
-        macro_gravado_teclado = []
-        set_macro_text_teclado(macro_gravado_teclado)
+        macro_gravado_teclado = Macro()
+        set_macro_teclado(macro_gravado_teclado)
         set_status("Macro de teclado atual limpa.")
     
+    # ----- Laços: repetições gravadas viram corpo + contador
+    def _fold(self, alvo: str, macro: Macro):
+        # A busca de repetições leva segundos em macros grandes: roda fora da
+        # thread da UI e o resultado volta por bus.macro_folded
+        if gravando or gravando_mouse:
+            set_status("Pare a gravação antes de dobrar a macro.")
+            return
+        if self._folding:
+            set_status("Já dobrando repetições…")
+            return
+        self._folding = True
+        set_status("Dobrando repetições…")
+        linhas = len(macro)
+
+        def worker():
+            try:
+                dobrada = fold_loops(macro)
+            except Exception as e:
+                print(f"Aviso: falha ao dobrar a macro ({e}).")
+                dobrada = None
+            bus.macro_folded.emit((alvo, macro, linhas, dobrada))
+
+        threading.Thread(target=worker, name="fold-loops", daemon=True).start()
+
+    def _on_macro_folded(self, result: Tuple[str, Macro, int, Optional[Macro]]):
+        global macro_gravado_teclado, macro_gravado_mouse
+        alvo, macro, linhas, dobrada = result
+        self._folding = False
+        atual = macro_gravado_teclado if alvo == "teclado" else macro_gravado_mouse
+        if dobrada is None:
+            set_status("Falha ao dobrar a macro.")
+            return
+        if atual is not macro or len(macro) != linhas:
+            set_status("A macro mudou durante a dobra; nada foi alterado.")
+            return
+        novos = len(loop_regions(dobrada)) - len(loop_regions(macro))
+        if novos <= 0:
+            set_status("Nenhuma repetição encontrada para dobrar.")
+            return
+        set_status(f"{novos} laço(s): {len(macro)} → {len(dobrada)} linhas "
+                   f"({macro.nbytes() // 1024} → {dobrada.nbytes() // 1024} KiB)")
+        if alvo == "teclado":
+            macro_gravado_teclado = dobrada
+            set_macro_teclado(macro_gravado_teclado)
+        else:
+            macro_gravado_mouse = dobrada
+            set_macro_mouse(macro_gravado_mouse)
+
+    def fold_macro_teclado(self):
+        self._fold("teclado", macro_gravado_teclado)
+
+    def fold_macro_mouse(self):
+        self._fold("mouse", macro_gravado_mouse)
+
     def start_record_mouse(self):
-        global gravando_mouse, macro_gravado_mouse, ultimo_tempo
+        global gravando_mouse, macro_gravado_mouse, relogio_mouse
         if gravando_mouse: return
         self.stop_all()
-        macro_gravado_mouse = []
+        macro_gravado_mouse = Macro()
+        relogio_mouse = SessionClock()
+        ring_mouse.reset_stats()
+        move_filter.break_run()
         gravando_mouse = True
-        ultimo_tempo = time.time()
-        set_macro_text_mouse(macro_gravado_mouse)
+        set_macro_mouse(macro_gravado_mouse)
         set_status("Gravando Macro (Mouse)... Pressione ESC para parar.")
 
     def stop_record_mouse(self):
         global gravando_mouse
         if not gravando_mouse: return
         gravando_mouse = False
-        set_status("Gravação de Mouse encerrada. Macro salva.")
+        self._finish_record_mouse()
+        set_status(f"Gravação de Mouse encerrada. Macro salva. ({self._ring_stats(ring_mouse)})")
+
+    def _finish_record_mouse(self):
+        # Simplificação do caminho (RDP) só ao fim da gravação; cliques/rolagens ficam intactos
+        global macro_gravado_mouse
+        self.recorder.drain()
+        macro_gravado_mouse = simplify_mouse_macro(macro_gravado_mouse, move_filter.cfg.rdp_tolerance)
+        set_macro_mouse(macro_gravado_mouse)
+
+    @staticmethod
+    def _ring_stats(ring: EventRing) -> str:
+        # Saúde da captura: eventos perdidos por ring cheio e pior latência do callback
+        return f"perdidos: {ring.overruns}, callback pior {ring.max_latency_ns / 1000:.1f}µs"
 
     def start_macro_mouse(self):
-        global executando, contador, macro_gravado_mouse
+        if jobs.stop(JOB_MACRO_MOUSE): return
         if not macro_gravado_mouse:
             set_status("Nenhuma macro de mouse gravada.")
             return
-        if executando: return
-        executando = True
-        contador = 0
-        set_counter(contador)
-        set_status("Executando Macro (Mouse)…")
-        infinite = self.page_auto.is_infinite()
-        reps = self.page_auto.get_reps()
-        def worker():
-            global executando, contador
-            try:
-                if infinite:
-                    while executando:
-                        for action_type, value, tempo in macro_gravado_mouse:
-                            if not executando: break
-                            time.sleep(tempo)
-                            if action_type == "move" or action_type == "position":
-                                mouse.position = value
-                            elif action_type == "click":
-                                mouse.click(value)
-                            elif action_type == "scroll":
-                                mouse.scroll(0, value[1])
-                        contador += 1
-                        set_counter(contador)
-                else:
-                    for _ in range(reps):
-                        if not executando: break
-                        for action_type, value, tempo in macro_gravado_mouse:
-                            if not executando: break
-                            time.sleep(tempo)
-                            if action_type == "move" or action_type == "position":
-                                mouse.position = value
-                            elif action_type == "click":
-                                mouse.click(value)
-                            elif action_type == "scroll":
-                                mouse.scroll(0, value[1])
-                        contador += 1
-                        set_counter(contador)
-            finally:
-                if executando: set_status("Pronto")
-        threading.Thread(target=worker, daemon=True).start()
+        self._start_plan(JOB_MACRO_MOUSE, macro_gravado_mouse)
         
     def clear_current_macro_mouse(self):
         global macro_gravado_mouse
-        macro_gravado_mouse = []
-        set_macro_text_mouse(macro_gravado_mouse)
+        macro_gravado_mouse = Macro()
+        set_macro_mouse(macro_gravado_mouse)
         set_status("Macro de mouse atual limpa.")
     
     def save_config(self):
         cfg = self.page_auto.to_config()
-        def _key_to_str(k):
-            return str(k) if isinstance(k, Key) else k
-        def _mouse_action_to_str(action):
-            if isinstance(action, MouseButton):
-                return str(action)
-            return action
-        cfg["macro_teclado"] = [(_key_to_str(k), a, d) for k, a, d in macro_gravado_teclado]
-        cfg["macro_mouse"] = [(a, _mouse_action_to_str(v), d) for a, v, d in macro_gravado_mouse]
+        cfg["filtro_mouse"] = move_filter_to_config(move_filter.cfg)
+        cfg["velocidade_macro"] = replay_speed_to_config(replay_speed)
+        cfg["atalhos"] = hotkeys.to_config()
+        cfg["script"] = self._current_script()
+        cfg["macro_teclado"] = macro_gravado_teclado.to_json()
+        cfg["macro_mouse"] = macro_gravado_mouse.to_json()
         with open(CONFIG_FILE, "w", encoding="utf-8") as f:
             json.dump(cfg, f, ensure_ascii=False, indent=2)
         set_status("Configuração salva.")
 
     def load_config(self, silent=False):
-        global macro_gravado_teclado, macro_gravado_mouse
-        if not os.path.exists(CONFIG_FILE):
+        self._apply_config(read_config(), silent)
+
+    def _apply_config(self, loaded: Optional[Tuple[dict, Macro, Macro]], silent: bool = True):
+        global macro_gravado_teclado, macro_gravado_mouse, replay_speed
+        if loaded is None:
             if not silent: set_status("Nenhum arquivo de configuração.")
             return
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            cfg = json.load(f)
+        cfg, teclado, mouse = loaded
+        # A leitura em segundo plano pode chegar com uma gravação já em
+        # andamento: a macro sendo gravada fica, a do arquivo é descartada
+        ignoradas = []
+        if gravando:
+            ignoradas.append("teclado")
+        else:
+            macro_gravado_teclado = teclado
+        if gravando_mouse:
+            ignoradas.append("mouse")
+        else:
+            macro_gravado_mouse = mouse
+        startup_mark("config aplicada")
         self.page_auto.set_from_config({
             "teclas_normais": cfg.get("teclas_normais", ""),
             "teclas_especiais": cfg.get("teclas_especiais", {}),
             "velocidade": cfg.get("velocidade", 0.5),
             "modo_infinito": cfg.get("modo_infinito", True),
             "repeticoes": cfg.get("repeticoes", 1),
-            "mouse_button": cfg.get("mouse_button", "Esquerdo")
+            "mouse_button": cfg.get("mouse_button", "Esquerdo"),
+            "turbo": cfg.get("turbo", False),
+            "turbo_cps": cfg.get("turbo_cps", 100.0),
+            "turbo_burst": cfg.get("turbo_burst", 1),
         })
-        macro_gravado_teclado = []
-        for k, a, d in cfg.get("macro_teclado", []):
-            try:
-                key_obj = getattr(Key, k.split(".")[-1]) if "Key." in k else k
-                macro_gravado_teclado.append((key_obj, a, d))
-            except AttributeError:
-                print(f"Aviso: Tecla desconhecida '{k}' não foi carregada.")
-        set_macro_text_teclado(macro_gravado_teclado)
-        
-        macro_gravado_mouse = []
-        for a, v, d in cfg.get("macro_mouse", []):
-            try:
-                if a == "click":
-                    button = getattr(MouseButton, v.split(".")[-1])
-                    macro_gravado_mouse.append((a, button, d))
-                else:
-                    macro_gravado_mouse.append((a, v, d))
-            except AttributeError:
-                print(f"Aviso: Ação de mouse desconhecida '{v}' não foi carregada.")
-        set_macro_text_mouse(macro_gravado_mouse)
-        
-        if not silent: set_status("Configuração carregada.")
+        move_filter.cfg = move_filter_from_config(cfg.get("filtro_mouse", {}))
+        if self._has_page("settings"):
+            self.page_settings.set_move_filter(move_filter.cfg)
+        replay_speed = replay_speed_from_config(cfg.get("velocidade_macro", {}))
+        if self._has_page("macro"):
+            self.page_macro.set_replay_speed(replay_speed)
+        self._load_hotkeys(cfg.get("atalhos", DEFAULT_HOTKEYS))
+        self._script_text = str(cfg.get("script", ""))
+        if self._has_page("macro"):
+            self.page_macro.set_script(self._script_text)
+        if not gravando:
+            set_macro_teclado(macro_gravado_teclado)
+        if not gravando_mouse:
+            set_macro_mouse(macro_gravado_mouse)
+        if ignoradas:
+            set_status(f"Gravação em andamento: macro de {' e '.join(ignoradas)} do arquivo ignorada.")
+        elif not silent: set_status("Configuração carregada.")
+
+    def _load_hotkeys(self, atalhos: dict):
+        try:
+            hotkeys.load(atalhos)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Aviso: atalhos inválidos, usando os padrões ({e}).")
+            hotkeys.load(DEFAULT_HOTKEYS)
+            return
+        validas = set(self._hotkey_actions()) | {"capturar_posicao"}
+        for acao in hotkeys.to_config().values():
+            nome = acao["acao"] if isinstance(acao, dict) else acao
+            if nome not in validas:
+                print(f"Aviso: ação de atalho desconhecida: {nome}")
 
     def delete_config(self):
         if os.path.exists(CONFIG_FILE):
@@ -937,31 +1732,29 @@ class MainWindow(QMainWindow):
         else:
             set_status("Nenhuma configuração para deletar.")
 
-    def load_profiles(self):
-        profiles = {}
-        if os.path.exists(PROFILES_FILE):
-            try:
-                with open(PROFILES_FILE, "r", encoding="utf-8") as f:
-                    profiles = json.load(f)
-            except json.JSONDecodeError:
-                QMessageBox.warning(self, "Erro", "Arquivo de perfis corrompido.")
-                profiles = {}
-        if not isinstance(profiles, dict): profiles = {}
-        self._profiles = profiles
-        self.page_macro.refresh_profiles(self._profiles)
+    def _on_profiles_loaded(self, result: Tuple[ProfileStore, str]):
+        # Só o índice foi lido; cada macro é decodificada ao carregar o perfil
+        self.profiles, erro = result
+        startup_mark("índice de perfis")
+        if erro:
+            QMessageBox.warning(self, "Erro", f"Arquivo de perfis corrompido: {erro}")
+        if self._has_page("macro"):
+            self.page_macro.refresh_profiles(self.profiles.names())
 
     def save_profile(self):
-        global macro_gravado_teclado
+        if not self.profiles.loaded:
+            set_status("Perfis ainda carregando…")
+            return
         name = self.page_macro.input_profile_name.text().strip()
         if not name:
             QMessageBox.warning(self, "Perfis", "Informe um nome para o perfil.")
             return
-        def _key_to_str(k):
-            return str(k) if isinstance(k, Key) else k
-        self._profiles[name] = [(_key_to_str(k), a, d) for k, a, d in macro_gravado_teclado]
-        with open(PROFILES_FILE, "w", encoding="utf-8") as f:
-            json.dump(self._profiles, f, ensure_ascii=False, indent=2)
-        self.page_macro.refresh_profiles(self._profiles)
+        try:
+            self.profiles.save(name, macro_gravado_teclado)
+        except OSError as e:
+            QMessageBox.critical(self, "Perfis", f"Erro ao salvar: {e}")
+            return
+        self.page_macro.refresh_profiles(self.profiles.names())
         set_status(f"Perfil '{name}' salvo.")
 
     def load_profile(self):
@@ -970,72 +1763,99 @@ class MainWindow(QMainWindow):
         if not name:
             set_status("Nenhum perfil selecionado.")
             return
-        data = self._profiles.get(name)
-        if not data:
+        if name not in self.profiles:
             set_status("Perfil não encontrado.")
             return
-        macro_gravado_teclado = []
-        for k, a, d in data:
-            try:
-                key_obj = getattr(Key, k.split(".")[-1]) if "Key." in k else k
-                macro_gravado_teclado.append((key_obj, a, d))
-            except AttributeError:
-                print(f"Aviso: Tecla desconhecida '{k}' em '{name}' não foi carregada.")
-        set_macro_text_teclado(macro_gravado_teclado)
+        try:
+            macro_gravado_teclado = self.profiles.get(name)
+        except (OSError, MacroFormatError) as e:
+            set_status(f"Perfil '{name}' inválido: {e}")
+            return
+        set_macro_teclado(macro_gravado_teclado)
         set_status(f"Perfil '{name}' carregado.")
 
     def delete_profile(self):
+        if not self.profiles.loaded:
+            set_status("Perfis ainda carregando…")
+            return
         name = self.page_macro.combo_profiles.currentText().strip()
         if not name:
             set_status("Nenhum perfil selecionado.")
             return
-        if name in self._profiles:
-            del self._profiles[name]
-            with open(PROFILES_FILE, "w", encoding="utf-8") as f:
-                json.dump(self._profiles, f, ensure_ascii=False, indent=2)
-            self.page_macro.refresh_profiles(self._profiles)
+        if name in self.profiles:
+            self.profiles.delete(name)
+            self.page_macro.refresh_profiles(self.profiles.names())
             set_status(f"Perfil '{name}' excluído.")
         else:
             set_status("Perfil não encontrado.")
 
     def export_profiles(self):
-        if not self._profiles:
+        # Exportação continua em JSON (formato portátil, o mesmo da importação)
+        if not len(self.profiles):
             QMessageBox.information(self, "Exportar Perfis", "Não há perfis para exportar.")
             return
         path, _ = QFileDialog.getSaveFileName(self, "Exportar Perfis", "perfis.json", "JSON (*.json)")
         if not path: return
         try:
+            data = {name: self.profiles.get(name).to_json() for name in self.profiles.names()}
             with open(path, "w", encoding="utf-8") as f:
-                json.dump(self._profiles, f, ensure_ascii=False, indent=2)
+                json.dump(data, f, ensure_ascii=False, indent=2)
             set_status(f"Perfis exportados para: {path}")
         except Exception as e:
             QMessageBox.critical(self, "Erro de Exportação", f"Erro ao exportar: {e}")
 
     def import_profiles(self):
+        if not self.profiles.loaded:
+            set_status("Perfis ainda carregando…")
+            return
         path, _ = QFileDialog.getOpenFileName(self, "Importar Perfis", "", "JSON (*.json)")
         if not path: return
         try:
             with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
             if not isinstance(data, dict): raise ValueError("Estrutura do arquivo inválida. Esperado um dicionário.")
-            self._profiles.update(data)
-            with open(PROFILES_FILE, "w", encoding="utf-8") as f:
-                json.dump(self._profiles, f, ensure_ascii=False, indent=2)
-            self.page_macro.refresh_profiles(self._profiles)
+            self.profiles.save_many({name: Macro.from_json(rows) for name, rows in data.items()})
+            self.page_macro.refresh_profiles(self.profiles.names())
             set_status("Perfis importados.")
         except Exception as e:
             QMessageBox.critical(self, "Importar Perfis", f"Erro ao importar: {e}")
 
+    def _poll_telemetry(self):
+        self._poll_jobs()
+        version, status = telemetry.snapshot()
+        if version == self._telemetry_version:
+            return
+        self._telemetry_version = version
+        self.on_status(status or "Pronto")
+
+    def _poll_jobs(self):
+        # Contadores lidos direto dos jobs ativos; sem job ativo o último valor fica na tela
+        ativos = jobs.active()
+        if not ativos:
+            return
+        contagens = [(job.name, job.reps if isinstance(job, SequenceJob) else job.count) for job in ativos]
+        if len(contagens) == 1:
+            self.on_counter(str(contagens[0][1]))
+        else:
+            self.on_counter(" · ".join(f"{nome} {n}" for nome, n in contagens))
+        if self._has_page("auto") and self.page_auto.is_turbo():
+            for job in ativos:
+                if isinstance(job, PacedJob):
+                    self.page_auto.set_turbo_stats(job.rate, job.stats.jitter)
+                    break
+
     def on_status(self, text: str):
         self.lbl_status.setText(f"Status: {text}")
 
-    def on_counter(self, value: int):
-        self.lbl_counter.setText(f"Repetições: {value}")
+    def on_counter(self, text: str):
+        if text != self._counter_text:
+            self._counter_text = text
+            self.lbl_counter.setText(f"Repetições: {text}")
 
 
 # ====== Execução
 def main():
-    app = QApplication(sys.argv)
+    app = QApplication([a for a in sys.argv if a != "--profile-startup"])
     
     app.setStyleSheet("""
         * {
@@ -1089,7 +1909,7 @@ def main():
             margin-bottom: 15px;
         }
 
-        QLineEdit, QTextEdit, QComboBox, QSpinBox {
+        QLineEdit, QTextEdit, QListView, QComboBox, QSpinBox {
             background: #2a2a3e;
             color: #e0e0e0;
             border: 1px solid #3c3c52;
@@ -1143,8 +1963,52 @@ def main():
     """)
     
     win = MainWindow()
+    startup_mark("janela construída")
     win.show()
+    if PROFILE_STARTUP:
+        QTimer.singleShot(0, lambda: startup_mark("janela visível"))
+        _report_startup_when_ready(app)
     sys.exit(app.exec())
 
+
+STARTUP_REPORT_FILE = "startup_profile.txt"
+STARTUP_PHASES = ("janela visível", "config aplicada", "índice de perfis", "listeners ativos")
+
+def _report_startup_when_ready(app: QApplication, timeout: float = 5.0):
+    # Espera as fases em segundo plano terminarem, imprime o relatório e sai
+    def check():
+        feitas = {label for label, _ in STARTUP_MARKS}
+        sem_config = not os.path.exists(CONFIG_FILE)
+        pendentes = [p for p in STARTUP_PHASES if p not in feitas and not (sem_config and p == "config aplicada")]
+        if pendentes and time.perf_counter() - STARTUP_T0 < timeout:
+            return
+        timer.stop()
+        relatorio = format_startup_report(pendentes)
+        print(relatorio)
+        # O executável é "windowed" (sem console): o relatório também vai para arquivo
+        with open(STARTUP_REPORT_FILE, "w", encoding="utf-8") as f:
+            f.write(relatorio + "\n")
+        app.quit()
+    timer = QTimer(app)
+    timer.setInterval(10)
+    timer.timeout.connect(check)
+    timer.start()
+
+def format_startup_report(pendentes: List[str]) -> str:
+    linhas = ["Inicialização (ms desde o início do módulo):"]
+    anterior = STARTUP_T0
+    visivel = None
+    for label, t in sorted(STARTUP_MARKS, key=lambda m: m[1]):
+        linhas.append(f"  {label:<20} {(t - STARTUP_T0) * 1000:8.1f}  (+{(t - anterior) * 1000:.1f})")
+        anterior = t
+        if label == "janela visível": visivel = t - STARTUP_T0
+    for p in pendentes:
+        linhas.append(f"  {p:<20} não concluída")
+    if visivel is not None:
+        veredito = "OK" if visivel <= STARTUP_TARGET_S else "ACIMA DA META"
+        linhas.append(f"Janela visível em {visivel * 1000:.0f}ms (meta {STARTUP_TARGET_S * 1000:.0f}ms): {veredito}")
+    linhas.append("Detalhe por módulo: python -X importtime autoclicker.py --profile-startup")
+    return "\n".join(linhas)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
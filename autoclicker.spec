@@ -1,5 +1,22 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# Só QtCore/QtGui/QtWidgets (e o plugin de SVG do stylesheet) são usados.
+# O resto do PySide6, e o que a versão antiga em tkinter arrastava
+# (numpy, tkinter), só aumenta o one-file e o tempo de extração na partida.
+# Meça com: autoclicker.exe --profile-startup
+EXCLUDES = [
+    'PySide6.QtNetwork', 'PySide6.QtQml', 'PySide6.QtQuick', 'PySide6.QtQuickWidgets',
+    'PySide6.QtQuick3D', 'PySide6.QtWebEngineCore', 'PySide6.QtWebEngineWidgets',
+    'PySide6.QtWebChannel', 'PySide6.QtWebSockets', 'PySide6.QtMultimedia',
+    'PySide6.QtMultimediaWidgets', 'PySide6.QtOpenGL', 'PySide6.QtOpenGLWidgets',
+    'PySide6.Qt3DCore', 'PySide6.Qt3DRender', 'PySide6.QtCharts', 'PySide6.QtDataVisualization',
+    'PySide6.QtSql', 'PySide6.QtTest', 'PySide6.QtPdf', 'PySide6.QtPdfWidgets',
+    'PySide6.QtBluetooth', 'PySide6.QtPositioning', 'PySide6.QtSensors', 'PySide6.QtSerialPort',
+    'PySide6.QtDesigner', 'PySide6.QtHelp', 'PySide6.QtUiTools', 'PySide6.QtXml',
+    'PySide6.QtConcurrent', 'PySide6.QtDBus', 'PySide6.QtPrintSupport',
+    'tkinter', 'customtkinter', 'numpy',
+]
+
 
 a = Analysis(
     ['autoclicker.py'],
@@ -10,7 +27,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=EXCLUDES,
     noarchive=False,
     optimize=0,
 )
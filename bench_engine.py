@@ -0,0 +1,328 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import subprocess
+from array import array
+from functools import partial
+from typing import Dict, Any, List, Callable
+
+from macro_engine import (
+    Macro, NS, OP_PRESS, OP_RELEASE, OP_MOVE, OP_CLICK,
+    Job, JobScheduler, PacedJob, SequenceJob, fold_loops, unfold_events, compile_plan, plan_steps, stream_steps,
+)
+from macro_store import MacroFile, write_macro
+from input_backend import InputBackend, NullBackend, resolve_symbols, make_binder
+
+# ====== Benchmark do motor de reprodução e dos auto clickers
+# Roda sem Qt e sem pynput: os eventos vão para um backend falso que só
+# anota o instante de cada chamada. Uso:
+#   python bench_engine.py --out bench.json
+#   python bench_engine.py --quick --compare bench.json
+
+
+class StampBackend(InputBackend):
+    # Backend falso mais leve que o RecordingBackend: só perf_counter_ns em array
+    name = "stamp"
+
+    def __init__(self):
+        self.stamps = array("q")
+        self._clock = time.perf_counter_ns
+
+    def press(self, key): self.stamps.append(self._clock())
+    def release(self, key): self.stamps.append(self._clock())
+    def click(self, button, count=1): self.stamps.append(self._clock())
+    def move(self, x, y): self.stamps.append(self._clock())
+    def scroll(self, dx, dy): self.stamps.append(self._clock())
+
+
+# ----- Macros sintéticas
+def macro_moves(n: int, delay_ns: int) -> Macro:
+    m = Macro()
+    for i in range(n):
+        m.append(OP_MOVE, (i + 1) * delay_ns, i % 1920, (i * 7) % 1080)
+    return m
+
+def macro_pausas(n: int, delay_ns: int) -> Macro:
+    m = Macro()
+    for i in range(n):
+        m.append_key(OP_PRESS if i % 2 == 0 else OP_RELEASE, "Key.space", (i + 1) * delay_ns)
+    return m
+
+def macro_misto(n: int, delay_ns: int) -> Macro:
+    m = Macro()
+    teclas = "abcdefghij"
+    for i in range(n):
+        t = (i + 1) * delay_ns
+        tipo = i % 4
+        if tipo == 0:
+            m.append_key(OP_PRESS, teclas[(i // 4) % 10], t)
+        elif tipo == 1:
+            m.append_key(OP_RELEASE, teclas[(i // 4) % 10], t)
+        elif tipo == 2:
+            m.append(OP_MOVE, t, i % 1920, i % 1080)
+        else:
+            m.append_key(OP_CLICK, "Button.left", t)
+    return m
+
+def macro_laco(repeticoes: int, corpo: int, delay_ns: int) -> Macro:
+    # Mesma sequência gravada várias vezes, com jitter humano: dobrável em um laço
+    m = Macro()
+    t = 0
+    for r in range(repeticoes):
+        for i in range(corpo):
+            t += delay_ns + (r * 7919 + i * 104729) % (delay_ns // 10 + 1)
+            if i % 2 == 0:
+                m.append_key(OP_PRESS, "abcdefghij"[(i // 2) % 10], t)
+            else:
+                m.append_key(OP_RELEASE, "abcdefghij"[(i // 2) % 10], t)
+    return m
+
+
+# ----- Estatística
+def percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    idx = min(len(valores) - 1, int(round(p / 100.0 * (len(valores) - 1))))
+    return valores[idx]
+
+def resumo_erros(erros_ns: List[int]) -> Dict[str, float]:
+    ordenados = sorted(erros_ns)
+    return {
+        "p50_us": percentil(ordenados, 50) / 1000.0,
+        "p99_us": percentil(ordenados, 99) / 1000.0,
+        "max_us": (ordenados[-1] / 1000.0) if ordenados else 0.0,
+    }
+
+def pico_memoria(build: Callable[[], Any]) -> int:
+    # Passe separado: o tracemalloc distorceria os tempos da execução medida
+    tracemalloc.start()
+    obj = build()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return pico
+
+
+# ----- Casos
+def rodar_job(job: Job) -> float:
+    # Roda o job sozinho num JobScheduler, como o app e a CLI; devolve a
+    # duração (s) do início do job até o finish
+    js = JobScheduler()
+    fim = threading.Event()
+    terminou = [0.0]
+
+    def on_finished(_job: Job):
+        terminou[0] = time.perf_counter()
+        fim.set()
+
+    js.on_finished = on_finished
+    js.start(job)
+    fim.wait()
+    if job.error is not None:
+        raise job.error
+    return terminou[0] - job.origin
+
+def bench_macro(build_macro: Callable[[], Macro]) -> Dict[str, Any]:
+    macro = build_macro()
+    backend = StampBackend()
+    plan = compile_plan(macro, make_binder(backend), resolve_symbols(macro, backend))
+
+    # Instante esperado de cada evento = instante gravado (laços desdobrados)
+    esperado = [ev[4] for ev in unfold_events(macro)]
+    total = macro.end_ns
+
+    job = SequenceJob("bench", partial(plan_steps, plan), 1)
+    cpu0 = time.process_time()
+    parede = rodar_job(job)
+    cpu = time.process_time() - cpu0
+
+    origem_ns = int(job.origin * NS)
+    erros = [t - origem_ns - e for t, e in zip(backend.stamps, esperado)]
+    memoria = pico_memoria(lambda: compile_plan(build_macro(), make_binder(NullBackend()), list(macro.symbols)))
+    res = {
+        "eventos": len(esperado),
+        "linhas_macro": len(macro),
+        "duracao_prevista_s": total / NS,
+        "duracao_real_s": parede,
+        "eventos_por_s": len(esperado) / parede if parede > 0 else 0.0,
+        "cpu_s": cpu,
+        "pico_memoria_bytes": memoria,
+        "bytes_por_evento_macro": macro.nbytes() / max(1, len(esperado)),
+    }
+    res.update(resumo_erros(erros))
+    return res
+
+def bench_stream(build_macro: Callable[[], Macro], compress: bool) -> Dict[str, Any]:
+    # Mesmo que bench_macro, mas reproduzindo de um .acm mapeado em memória
+    macro = build_macro()
+    backend = StampBackend()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.acm")
+        write_macro(path, macro, compress=compress)
+        tamanho = os.path.getsize(path)
+        with MacroFile(path) as mf:
+            bind, objs = make_binder(backend), resolve_symbols(mf, backend)
+            job = SequenceJob("bench", lambda: stream_steps(mf, bind, objs), 1)
+            cpu0 = time.process_time()
+            parede = rodar_job(job)
+            cpu = time.process_time() - cpu0
+
+    origem_ns = int(job.origin * NS)
+    erros = [t - origem_ns - e for t, e in zip(backend.stamps, macro.t_ns)]
+    res = {
+        "eventos": len(macro),
+        "duracao_prevista_s": macro.end_ns / NS,
+        "duracao_real_s": parede,
+        "eventos_por_s": len(macro) / parede if parede > 0 else 0.0,
+        "cpu_s": cpu,
+        "bytes_por_evento_arquivo": tamanho / max(1, len(macro)),
+    }
+    res.update(resumo_erros(erros))
+    return res
+
+def bench_auto_click(cps: float, burst: int, segundos: float) -> Dict[str, Any]:
+    backend = StampBackend()
+    intervalo = burst / cps
+    job = PacedJob("bench", lambda: backend.click(None), intervalo, burst, int(cps * segundos))
+    cpu0 = time.process_time()
+    decorrido = rodar_job(job)
+    cpu = time.process_time() - cpu0
+    # Erro de cada clique em relação ao deadline que o job pediu. Mesma conta
+    # do PacedJob: atrasado, o próximo deadline parte do disparo anterior
+    # (aproximado pelo primeiro clique dele)
+    intervalo_ns = int(intervalo * NS)
+    deadline = int(job.origin * NS)
+    erros = []
+    for i, t in enumerate(backend.stamps):
+        if i and i % burst == 0:
+            deadline = max(deadline + intervalo_ns, backend.stamps[i - burst])
+        erros.append(t - deadline)
+    res = {
+        "cps_alvo": cps,
+        "burst": burst,
+        "cliques": job.count,
+        "cps_alcancado": job.count / decorrido if decorrido > 0 else 0.0,
+        "jitter_us": job.stats.jitter * 1e6,
+        "cpu_s": cpu,
+    }
+    res.update(resumo_erros(erros))
+    return res
+
+
+def bench_jobs(n_jobs: int, cps: float, segundos: float) -> Dict[str, Any]:
+    # Vários auto clickers no mesmo thread do JobScheduler: o CPU deve ficar
+    # praticamente igual com 1 ou com dezenas de jobs
+    js = JobScheduler()
+    backends = [StampBackend() for _ in range(n_jobs)]
+    jobs = [PacedJob(str(i), lambda b=b: b.click(None), 1.0 / cps, total=int(cps * segundos))
+            for i, b in enumerate(backends)]
+    cpu0 = time.process_time()
+    for job in jobs:
+        js.start(job)
+    while js.busy:
+        time.sleep(0.01)
+    cpu = time.process_time() - cpu0
+    intervalo_ns = NS / cps
+    erros = []
+    for job, b in zip(jobs, backends):
+        origem_ns = int(job.origin * NS)
+        erros.extend(t - origem_ns - int(i * intervalo_ns) for i, t in enumerate(b.stamps))
+    cliques = sum(job.count for job in jobs)
+    res = {
+        "jobs": n_jobs,
+        "cps_por_job": cps,
+        "cliques": cliques,
+        "cps_alcancado": cliques / segundos,
+        "cpu_s": cpu,
+    }
+    res.update(resumo_erros(erros))
+    return res
+
+
+def casos(quick: bool) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    c = {
+        # Sem atraso: mede a vazão máxima do motor (eventos/s sustentados)
+        "vazao_100k_sem_atraso": lambda: bench_macro(lambda: macro_moves(100_000, 0)),
+        "moves_1k_1ms": lambda: bench_macro(lambda: macro_moves(1_000, 1_000_000)),
+        "moves_100k_10us": lambda: bench_macro(lambda: macro_moves(100_000, 10_000)),
+        "pausas_longas_20x50ms": lambda: bench_macro(lambda: macro_pausas(20, 50_000_000)),
+        "misto_10k_100us": lambda: bench_macro(lambda: macro_misto(10_000, 100_000)),
+        "laco_dobrado_500x40_100us": lambda: bench_macro(lambda: fold_loops(macro_laco(500, 40, 100_000))),
+        "arquivo_100k_10us": lambda: bench_stream(lambda: macro_moves(100_000, 10_000), False),
+        "arquivo_zlib_100k_10us": lambda: bench_stream(lambda: macro_moves(100_000, 10_000), True),
+        "auto_click_1000cps": lambda: bench_auto_click(1000.0, 1, 1.0),
+        "auto_click_20000cps_burst10": lambda: bench_auto_click(20000.0, 10, 1.0),
+        "jobs_1x20cps": lambda: bench_jobs(1, 20.0, 1.0),
+        "jobs_32x20cps": lambda: bench_jobs(32, 20.0, 1.0),
+    }
+    if not quick:
+        c["moves_1m_1us"] = lambda: bench_macro(lambda: macro_moves(1_000_000, 1_000))
+    return c
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def comparar(atual: Dict[str, Any], anterior: Dict[str, Any]):
+    # Mostra a variação das métricas principais entre duas execuções
+    for nome, res in atual["casos"].items():
+        antes = anterior.get("casos", {}).get(nome)
+        if not antes:
+            continue
+        partes = []
+        for chave in ("eventos_por_s", "cps_alcancado", "p99_us", "cpu_s", "pico_memoria_bytes"):
+            if chave in res and antes.get(chave):
+                delta = (res[chave] - antes[chave]) / antes[chave] * 100.0
+                partes.append(f"{chave} {delta:+.1f}%")
+        print(f"  {nome}: " + ", ".join(partes))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do motor de reprodução e auto clickers")
+    parser.add_argument("--out", default="bench_output.json", help="arquivo JSON de saída")
+    parser.add_argument("--quick", action="store_true", help="pula o caso de 1M eventos")
+    parser.add_argument("--only", nargs="*", help="roda só os casos indicados")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args(argv)
+
+    resultados: Dict[str, Any] = {}
+    for nome, rodar in casos(args.quick).items():
+        if args.only and nome not in args.only:
+            continue
+        print(f"{nome}…", end=" ", flush=True)
+        resultados[nome] = res = rodar()
+        taxa = res.get("eventos_por_s", res.get("cps_alcancado", 0.0))
+        print(f"{taxa:,.0f}/s  p50 {res['p50_us']:.1f}µs  p99 {res['p99_us']:.1f}µs  máx {res['max_us']:.1f}µs")
+
+    saida = {
+        "meta": {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "casos": resultados,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(saida, f, ensure_ascii=False, indent=2)
+    print(f"Resultados em {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            comparar(saida, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+# ====== Atalhos globais configuráveis
+# Usado pelo consumidor do ring de teclado (nunca pela thread do hook): cada
+# press atualiza a máscara de modificadores e o atalho sai de um lookup de
+# dict por (máscara, tecla). Nomes de tecla seguem a tabela de símbolos da
+# Macro ("a", "Key.f6"); acordes no texto são "ctrl+shift+c", "f6", "alt+f9".
+
+MOD_CTRL, MOD_SHIFT, MOD_ALT, MOD_CMD = 1, 2, 4, 8
+MOD_NAMES = {"ctrl": MOD_CTRL, "shift": MOD_SHIFT, "alt": MOD_ALT, "cmd": MOD_CMD}
+
+# Tecla modificadora -> bit por lado (os dois Ctrl somem só quando ambos soltam)
+_SIDE_BITS: Dict[str, int] = {}
+for _i, (_nome, _mod) in enumerate(MOD_NAMES.items()):
+    _SIDE_BITS[f"Key.{_nome}"] = _SIDE_BITS[f"Key.{_nome}_l"] = 1 << (2 * _i)
+    _SIDE_BITS[f"Key.{_nome}_r"] = 1 << (2 * _i + 1)
+_SIDE_BITS["Key.alt_gr"] = _SIDE_BITS["Key.alt_r"]
+
+# Máscara por lado (8 bits) -> máscara normalizada (4 bits), pré-calculada
+_NORMALIZE = tuple(
+    sum(mod for i, mod in enumerate(MOD_NAMES.values()) if raw & (3 << (2 * i)))
+    for raw in range(256)
+)
+
+DEBOUNCE_S = 0.25  # intervalo mínimo entre dois disparos do mesmo atalho
+
+# Ações reconhecidas pela janela e atalhos padrão
+DEFAULT_HOTKEYS: Dict[str, str] = {
+    "f6": "auto_teclado",
+    "f7": "auto_mouse",
+    "f8": "macro_teclado",
+    "f9": "parar_tudo",
+    "ctrl+shift+c": "capturar_posicao",
+}
+
+
+def normalize_key(name: str) -> str:
+    # "C" (com Shift) e "\x03" (Ctrl+C no Windows) viram "c"
+    if len(name) == 1:
+        o = ord(name)
+        if 1 <= o <= 26:
+            return chr(o + 96)
+        return name.lower()
+    return name
+
+
+def parse_chord(text: str) -> Tuple[int, str]:
+    # "ctrl+shift+c" -> (MOD_CTRL | MOD_SHIFT, "c"); "f6" -> (0, "Key.f6")
+    partes = [p.strip().lower() for p in text.split("+") if p.strip()]
+    if not partes:
+        raise ValueError(f"atalho vazio: {text!r}")
+    mods = 0
+    for p in partes[:-1]:
+        if p not in MOD_NAMES:
+            raise ValueError(f"modificador desconhecido em {text!r}: {p}")
+        mods |= MOD_NAMES[p]
+    tecla = partes[-1]
+    if tecla in MOD_NAMES:
+        raise ValueError(f"atalho sem tecla principal: {text!r}")
+    return mods, tecla if len(tecla) == 1 else f"Key.{tecla}"
+
+
+def format_chord(mods: int, key: str) -> str:
+    nomes = [nome for nome, mod in MOD_NAMES.items() if mods & mod]
+    nomes.append(key[4:] if key.startswith("Key.") else key)
+    return "+".join(nomes)
+
+
+@dataclass
+class Hotkey:
+    action: str
+    debounce: float = DEBOUNCE_S
+    last_ns: int = -(1 << 62)  # último disparo (relógio do evento)
+
+
+class HotkeyRegistry:
+    def __init__(self, debounce: float = DEBOUNCE_S):
+        self.debounce = debounce
+        self._table: Dict[Tuple[int, str], Hotkey] = {}
+        self._raw = 0                  # modificadores pressionados, um bit por lado
+        self.mods = 0                  # máscara normalizada (MOD_*)
+        self._down: Dict[str, None] = {}  # teclas de atalho seguradas (auto-repeat)
+
+    # ----- Configuração (thread da UI)
+    def bind(self, chord: str, action: str, debounce: Optional[float] = None):
+        self._table[parse_chord(chord)] = Hotkey(action, self.debounce if debounce is None else debounce)
+
+    def load(self, cfg: Dict[str, Union[str, dict]]):
+        # {"f6": "auto_teclado", "alt+f9": {"acao": "parar_tudo", "debounce": 0.5}}
+        # A tabela nova é montada à parte e trocada de uma vez
+        tabela: Dict[Tuple[int, str], Hotkey] = {}
+        for chord, valor in cfg.items():
+            if isinstance(valor, dict):
+                hk = Hotkey(str(valor["acao"]), float(valor.get("debounce", self.debounce)))
+            else:
+                hk = Hotkey(str(valor), self.debounce)
+            tabela[parse_chord(chord)] = hk
+        self._table = tabela
+
+    def to_config(self) -> Dict[str, Union[str, dict]]:
+        cfg: Dict[str, Union[str, dict]] = {}
+        for (mods, key), hk in self._table.items():
+            chord = format_chord(mods, key)
+            cfg[chord] = hk.action if hk.debounce == self.debounce else {"acao": hk.action, "debounce": hk.debounce}
+        return cfg
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    # ----- Eventos (thread do consumidor)
+    def press(self, name: str, t_ns: int) -> Optional[str]:
+        # Devolve a ação a disparar, ou None. Repetições do auto-repeat do SO
+        # (press sem release) e disparos dentro do debounce são ignorados.
+        # Um atalho sem modificadores vale com qualquer modificador segurado:
+        # F9 para tudo mesmo com um Ctrl/Shift preso por uma macro (o listener
+        # também vê os eventos injetados).
+        bit = _SIDE_BITS.get(name)
+        if bit is not None:
+            self._raw |= bit
+            self.mods = _NORMALIZE[self._raw]
+            return None
+        key = normalize_key(name)
+        hk = self._table.get((self.mods, key))
+        if hk is None and self.mods:
+            hk = self._table.get((0, key))
+        if hk is None:
+            return None
+        if key in self._down:
+            return None
+        self._down[key] = None
+        if t_ns - hk.last_ns < hk.debounce * 1_000_000_000:
+            return None
+        hk.last_ns = t_ns
+        return hk.action
+
+    def release(self, name: str):
+        bit = _SIDE_BITS.get(name)
+        if bit is not None:
+            self._raw &= ~bit
+            self.mods = _NORMALIZE[self._raw]
+            return
+        self._down.pop(normalize_key(name), None)
+
+    def reset(self):
+        # Depois de eventos perdidos (ring de teclado cheio): um release de
+        # modificador perdido deixaria todos os atalhos sem casar
+        self._raw = self.mods = 0
+        self._down.clear()
@@ -0,0 +1,143 @@
+import time
+from functools import partial
+from typing import Any, Dict, List, Tuple, Optional
+
+from macro_engine import (
+    Macro, HeldKeys, Binder,
+    OP_PRESS, OP_RELEASE, OP_MOVE, OP_CLICK, OP_SCROLL, OP_POSITION,
+)
+
+# ====== Backends de entrada: para onde os eventos reproduzidos vão
+# Os workers só falam com esta interface; o pynput é apenas uma implementação.
+
+
+class InputBackend:
+    name = "base"
+
+    def resolve(self, symbol: str) -> Any:
+        # Nome da tabela de símbolos ("a", "Key.space", "Button.left") -> objeto do backend
+        return symbol
+
+    def press(self, key: Any): raise NotImplementedError
+    def release(self, key: Any): raise NotImplementedError
+    def click(self, button: Any, count: int = 1): raise NotImplementedError
+    def move(self, x: int, y: int): raise NotImplementedError
+    def scroll(self, dx: int, dy: int): raise NotImplementedError
+
+
+class PynputBackend(InputBackend):
+    name = "pynput"
+
+    def __init__(self):
+        # Import tardio: os outros backends funcionam sem display/pynput (CI headless)
+        from pynput.keyboard import Controller, Key, KeyCode
+        from pynput.mouse import Controller as MouseController, Button
+        self._KeyCode = KeyCode
+        self.keyboard = Controller()
+        self.mouse = MouseController()
+        # Tabela nome -> objeto montada uma vez: resolve() vira um lookup de dict
+        self._names: Dict[str, Any] = {f"Key.{n}": k for n, k in Key.__members__.items()}
+        self._names.update({f"Button.{n}": b for n, b in Button.__members__.items()})
+
+    def resolve(self, symbol: str) -> Any:
+        obj = self._names.get(symbol)
+        if obj is not None:
+            return obj
+        if symbol.startswith(("Key.", "Button.")):
+            raise AttributeError(symbol)  # nome especial que esta plataforma não tem
+        if symbol.startswith("<") and symbol.endswith(">") and len(symbol) > 2:
+            obj = self._names[symbol] = self._KeyCode.from_vk(int(symbol[1:-1]))
+            return obj
+        return symbol
+
+    def press(self, key: Any):
+        self.keyboard.press(key)
+
+    def release(self, key: Any):
+        self.keyboard.release(key)
+
+    def click(self, button: Any, count: int = 1):
+        self.mouse.click(button, count)
+
+    def move(self, x: int, y: int):
+        self.mouse.position = (x, y)
+
+    def scroll(self, dx: int, dy: int):
+        self.mouse.scroll(dx, dy)
+
+
+class NullBackend(InputBackend):
+    # Descarta tudo: mede só o overhead do motor
+    name = "null"
+
+    def press(self, key: Any): pass
+    def release(self, key: Any): pass
+    def click(self, button: Any, count: int = 1): pass
+    def move(self, x: int, y: int): pass
+    def scroll(self, dx: int, dy: int): pass
+
+
+class RecordingBackend(InputBackend):
+    # Guarda (perf_counter_ns, ação, argumentos) em memória para verificar
+    # a precisão temporal da reprodução
+    name = "recording"
+
+    def __init__(self):
+        self.events: List[Tuple[int, str, tuple]] = []
+        self._clock = time.perf_counter_ns
+
+    def clear(self):
+        self.events = []
+
+    def press(self, key: Any):
+        self.events.append((self._clock(), "press", (key,)))
+
+    def release(self, key: Any):
+        self.events.append((self._clock(), "release", (key,)))
+
+    def click(self, button: Any, count: int = 1):
+        self.events.append((self._clock(), "click", (button, count)))
+
+    def move(self, x: int, y: int):
+        self.events.append((self._clock(), "move", (x, y)))
+
+    def scroll(self, dx: int, dy: int):
+        self.events.append((self._clock(), "scroll", (dx, dy)))
+
+
+BACKENDS = {"pynput": PynputBackend, "null": NullBackend, "recording": RecordingBackend}
+
+
+# ====== Ligação backend <-> plano de reprodução
+
+def resolve_symbols(macro: Macro, backend: InputBackend) -> List[Optional[Any]]:
+    # Resolve a tabela de símbolos uma vez por execução (não por evento)
+    objs = []
+    for name in macro.symbols:
+        try:
+            objs.append(backend.resolve(name))
+        except (AttributeError, ValueError):
+            print(f"Aviso: Tecla desconhecida '{name}' será ignorada.")
+            objs.append(None)
+    return objs
+
+
+def make_binder(backend: InputBackend, held: Optional[HeldKeys] = None) -> Binder:
+    press = held.press if held is not None else backend.press
+    release = held.release if held is not None else backend.release
+
+    def bind(op: int, x: int, y: int, obj: Any):
+        if op == OP_MOVE or op == OP_POSITION:
+            return partial(backend.move, x, y)
+        if op == OP_SCROLL:
+            return partial(backend.scroll, 0, y)
+        if obj is None:
+            return None  # tecla/botão que não pôde ser resolvido
+        if op == OP_PRESS:
+            return partial(press, obj)
+        if op == OP_RELEASE:
+            return partial(release, obj)
+        if op == OP_CLICK:
+            return partial(backend.click, obj, x) if x > 1 else partial(backend.click, obj)
+        return None
+    return bind
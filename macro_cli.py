@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from macro_engine import (
+    Macro, Job, JobScheduler, PacedJob, SequenceJob, HeldKeys, ReplaySpeed, SPEED_MIN, SPEED_MAX, stream_steps,
+    played_events,
+)
+from input_backend import BACKENDS, InputBackend, resolve_symbols, make_binder
+from macro_store import MacroFile, MacroFormatError, ProfileStore, PROFILES_DIR, EXTENSION
+from macro_script import SCRIPT_EXTENSION, compile_script
+
+# ====== Linha de comando sem interface (nunca importa PySide6)
+# Mesmo formato de gravação e mesmos jobs (JobScheduler) da janela:
+#   python autoclicker.py run Farm_1 --reps 10 --speed 2
+#   python autoclicker.py run macro.acm --reps 0            (0 = infinito, Ctrl+C para)
+#   python autoclicker.py run Farm_1 --fast --idle-threshold 100 --min-gap 5
+#   python autoclicker.py run farm.acs --reps 3              (script compilado antes de rodar)
+#   python autoclicker.py click --cps 50 --button left --count 500
+# Ao sair imprime as estatísticas de tempo (ou JSON com --json).
+
+EXIT_OK = 0
+EXIT_ERRO = 1
+EXIT_INTERROMPIDO = 130
+
+MOUSE_BUTTONS = ("left", "right", "middle")
+
+
+def open_source(alvo: str, profiles_dir: str):
+    # Arquivo .acm (streaming), .acs (script), .json (linhas de macro ou config da janela) ou nome de perfil
+    if os.path.isfile(alvo):
+        if alvo.lower().endswith(EXTENSION):
+            return MacroFile(alvo)
+        if alvo.lower().endswith(SCRIPT_EXTENSION):
+            with open(alvo, "r", encoding="utf-8") as f:
+                return compile_script(f.read())
+        with open(alvo, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and "macro_teclado" in data:
+            data = data["macro_teclado"]  # arquivo de configuração da janela
+        if not isinstance(data, list):
+            raise ValueError(f"{alvo}: esperado uma lista de eventos de macro")
+        return Macro.from_json(data)
+    store = ProfileStore(profiles_dir)
+    try:
+        store.load()
+    except ValueError as e:
+        if not store.loaded:
+            raise
+        print(f"Aviso: {e}", file=sys.stderr)  # índice reconstruído a partir dos .acm
+    if alvo not in store:
+        raise ValueError(f"perfil ou arquivo não encontrado: {alvo}")
+    return store.open(alvo)
+
+
+def run_job(job: Job, limite: float = 0.0) -> Tuple[bool, float]:
+    # Roda o job num JobScheduler próprio e espera em fatias curtas: Ctrl+C
+    # chega ao thread principal em qualquer SO. limite > 0 encerra o job depois
+    # de tantos segundos (fim normal). Devolve (completo, duração real em s);
+    # completo é False se o usuário interrompeu.
+    jobs = JobScheduler()
+    fim = threading.Event()
+    terminou: List[float] = []
+
+    def finished(_job: Job):
+        terminou.append(time.perf_counter())
+        fim.set()
+
+    jobs.on_finished = finished
+    jobs.start(job)
+    completo = True
+    try:
+        while not fim.wait(0.1 if limite <= 0 else max(0.0, min(0.1, limite - job.elapsed()))):
+            if limite > 0 and job.elapsed() >= limite:
+                jobs.stop(job.name)
+                fim.wait()
+                job.stop_latency = None  # fim pelo limite de tempo, não pelo usuário
+    except KeyboardInterrupt:
+        completo = False
+        jobs.stop(job.name)
+        fim.wait()  # o finish solta as teclas seguradas
+    return completo, terminou[0] - job.origin
+
+
+def cmd_run(args, backend: InputBackend) -> Dict[str, Any]:
+    source = open_source(args.alvo, args.profiles_dir)
+    try:
+        por_rep = played_events(source)  # laços contam todas as voltas
+        if por_rep == 0:
+            # Sem ações, --reps 0 só repetiria uma linha do tempo vazia
+            raise ValueError(f"{args.alvo}: a macro não tem eventos para reproduzir")
+        held = HeldKeys(backend.press, backend.release)
+        bind, objs = make_binder(backend, held), resolve_symbols(source, backend)
+    except BaseException:
+        if isinstance(source, MacroFile):
+            source.close()
+        raise
+    speed = ReplaySpeed(args.speed, args.fast, args.idle_threshold / 1000.0, args.min_gap / 1000.0)
+
+    def cleanup():
+        held.release_all()  # nenhuma tecla fica presa, mesmo com Ctrl+C
+        if isinstance(source, MacroFile):
+            source.close()
+
+    job = SequenceJob("run", lambda: stream_steps(source, bind, objs, speed),
+                      args.reps if args.reps > 0 else None, cleanup, held)
+    completo, decorrido = run_job(job)
+    # Previsto e real medidos no mesmo ponto: o último passo executado (sem
+    # o intervalo final da repetição, que a reprodução não espera)
+    ultimo = job.count > 0
+    prevista = job.last_deadline - job.origin if ultimo else 0.0
+    real = job.last_fired - job.origin if ultimo else 0.0
+    return {
+        "comando": "run",
+        "alvo": args.alvo,
+        "completo": completo,
+        "eventos_por_repeticao": por_rep,
+        "repeticoes": job.reps,
+        "velocidade": args.speed,
+        "duracao_prevista_s": prevista,
+        "duracao_real_s": real,
+        "deriva_media_ms": job.stats.media * 1000,
+        "deriva_max_ms": job.stats.maximo * 1000,
+        "jitter_ms": job.stats.jitter * 1000,
+        "eventos_por_s": job.count / decorrido if decorrido > 0 else 0.0,
+        "parada_ms": job.stop_latency * 1000 if job.stop_latency is not None else None,
+        "erro": str(job.error) if job.error is not None else None,
+    }
+
+
+def cmd_click(args, backend: InputBackend) -> Dict[str, Any]:
+    button = backend.resolve(f"Button.{args.button}")
+    job = PacedJob("click", lambda: backend.click(button), args.burst / args.cps, args.burst,
+                   args.count if args.count > 0 else None)
+    completo, real = run_job(job, args.duration)
+    return {
+        "comando": "click",
+        "completo": completo,
+        "botao": args.button,
+        "cps_alvo": args.cps,
+        "burst": args.burst,
+        "cliques": job.count,
+        "cps_alcancado": job.count / real if real > 0 else 0.0,
+        "duracao_real_s": real,
+        "deriva_media_ms": job.stats.media * 1000,
+        "jitter_ms": job.stats.jitter * 1000,
+        "parada_ms": job.stop_latency * 1000 if job.stop_latency is not None else None,
+        "erro": str(job.error) if job.error is not None else None,
+    }
+
+
+def format_stats(res: Dict[str, Any]) -> str:
+    linhas = []
+    estado = "erro" if res["erro"] else "concluído" if res["completo"] else "interrompido"
+    if res["comando"] == "run":
+        linhas.append(f"{res['alvo']}: {res['repeticoes']} repetições de {res['eventos_por_repeticao']} eventos ({estado})")
+        linhas.append(f"  tempo real {res['duracao_real_s']:.3f}s, previsto {res['duracao_prevista_s']:.3f}s "
+                      f"(velocidade {res['velocidade']:g}x)")
+        linhas.append(f"  deriva média {res['deriva_media_ms']:.3f}ms, máx {res['deriva_max_ms']:.3f}ms, "
+                      f"jitter {res['jitter_ms']:.3f}ms, {res['eventos_por_s']:,.0f} eventos/s")
+    else:
+        linhas.append(f"click {res['botao']}: {res['cliques']} cliques em {res['duracao_real_s']:.3f}s ({estado})")
+        linhas.append(f"  CPS alvo {res['cps_alvo']:g}, alcançado {res['cps_alcancado']:.1f} (burst {res['burst']}), "
+                      f"deriva média {res['deriva_media_ms']:.3f}ms, jitter {res['jitter_ms']:.3f}ms")
+    if res["parada_ms"] is not None:
+        linhas.append(f"  parada em {res['parada_ms']:.2f}ms")
+    return "\n".join(linhas)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="autoclicker.py", description="Executa macros e auto clicker sem interface")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pynput",
+                        help="destino dos eventos (null = ensaio, nada é enviado ao sistema)")
+    parser.add_argument("--json", action="store_true", help="estatísticas em JSON")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    run = sub.add_parser("run", help="reproduz um perfil ou arquivo de macro (.acm/.acs/.json)")
+    run.add_argument("alvo", help="nome do perfil ou caminho do arquivo")
+    run.add_argument("--reps", type=int, default=1, help="repetições (0 = infinito)")
+    run.add_argument("--speed", type=float, default=1.0,
+                     help=f"fator de velocidade, {SPEED_MIN:g} a {SPEED_MAX:g} (2 = duas vezes mais rápido)")
+    run.add_argument("--fast", action="store_true", help="o mais rápido possível: encolhe as pausas longas")
+    run.add_argument("--idle-threshold", type=float, default=ReplaySpeed.idle_threshold * 1000,
+                     help="com --fast, pausas acima disto (ms) viram --min-gap")
+    run.add_argument("--min-gap", type=float, default=0.0, help="intervalo mínimo entre eventos (ms)")
+    run.add_argument("--profiles-dir", default=PROFILES_DIR, help="pasta dos perfis")
+
+    click = sub.add_parser("click", help="auto clicker de mouse em ritmo fixo")
+    click.add_argument("--cps", type=float, default=10.0, help="cliques por segundo")
+    click.add_argument("--button", choices=MOUSE_BUTTONS, default="left")
+    click.add_argument("--burst", type=int, default=1, help="cliques por despertar")
+    click.add_argument("--count", type=int, default=0, help="total de cliques (0 = até Ctrl+C)")
+    click.add_argument("--duration", type=float, default=0.0, help="duração máxima em s (0 = sem limite)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.comando == "run" and not SPEED_MIN <= args.speed <= SPEED_MAX:
+        parser.error(f"--speed deve estar entre {SPEED_MIN:g} e {SPEED_MAX:g}")
+    if args.comando == "click" and args.cps <= 0:
+        parser.error("--cps deve ser maior que zero")
+    try:
+        backend = BACKENDS[args.backend]()
+    except ImportError as e:
+        # pynput ausente (ou sem display): --backend null ainda funciona
+        print(f"Erro: backend {args.backend} indisponível ({e})", file=sys.stderr)
+        return EXIT_ERRO
+    try:
+        res = cmd_run(args, backend) if args.comando == "run" else cmd_click(args, backend)
+    except (OSError, ValueError, MacroFormatError, AttributeError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return EXIT_ERRO
+    print(json.dumps(res, ensure_ascii=False, indent=2) if args.json else format_stats(res))
+    if res["erro"]:
+        # Exceção dentro do job (registrada pelo JobScheduler): não é um fim normal
+        print(f"Erro: {res['erro']}", file=sys.stderr)
+        return EXIT_ERRO
+    return EXIT_OK if res["completo"] else EXIT_INTERROMPIDO
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1177 @@
+import heapq
+import itertools
+from bisect import bisect_right
+from collections import deque
+import math
+import threading
+import time
+import traceback
+from array import array
+from dataclasses import dataclass
+from typing import List, Tuple, Dict, Any, Iterator, Callable, Optional
+
+# ====== Armazenamento compacto de macros
+
+# Opcodes (int8). Teclas e botões ficam na tabela de símbolos (code = índice).
+OP_PRESS, OP_RELEASE, OP_MOVE, OP_CLICK, OP_SCROLL, OP_POSITION, OP_LOOP, OP_WAIT = range(8)
+OP_NAMES = ("press", "release", "move", "click", "scroll", "position", "loop", "wait")
+# OP_LOOP é um marcador depois do corpo de um laço dobrado: x = vezes,
+# y = linhas do corpo, t_ns = instante do último evento da última repetição.
+# OP_WAIT não faz nada: só estende a linha do tempo (pausa no fim de um script).
+# OP_CLICK com x > 1 = cliques múltiplos (x vezes).
+KEYBOARD_OPS = (OP_PRESS, OP_RELEASE)
+
+NS = 1_000_000_000
+
+
+class Macro:
+    # Colunas paralelas em array (~21 bytes/evento) em vez de lista de tuplas.
+    # Teclas/botões são guardados pelo nome ("a", "Key.space", "Button.left")
+    # numa tabela interna; quem reproduz resolve os nomes uma única vez.
+    # O tempo é o instante de cada evento (ns, monotônico) na linha do tempo
+    # da macro; os atrasos são derivados na compilação, nunca acumulados.
+    __slots__ = ("op", "x", "y", "code", "t_ns", "symbols", "_symbol_index")
+
+    def __init__(self, symbols: List[str] = None):
+        self.op = array("b")
+        self.x = array("i")
+        self.y = array("i")
+        self.code = array("i")
+        self.t_ns = array("q")
+        self.symbols: List[str] = []
+        self._symbol_index: Dict[str, int] = {}
+        for name in symbols or ():
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        idx = self._symbol_index.get(name)
+        if idx is None:
+            idx = self._symbol_index[name] = len(self.symbols)
+            self.symbols.append(name)
+        return idx
+
+    def append(self, op: int, t_ns: int, x: int = 0, y: int = 0, code: int = -1):
+        # "op" por último: len() só enxerga linhas completas (leitura em outra thread)
+        self.x.append(x)
+        self.y.append(y)
+        self.code.append(code)
+        self.t_ns.append(t_ns)
+        self.op.append(op)
+
+    def append_key(self, op: int, name: str, t_ns: int):
+        self.append(op, t_ns, code=self.intern(name))
+
+    def append_from(self, other: "Macro", i: int, t_ns: Optional[int] = None):
+        code = other.code[i]
+        if code >= 0:
+            code = self.intern(other.symbols[code])
+        self.append(other.op[i], other.t_ns[i] if t_ns is None else t_ns, other.x[i], other.y[i], code)
+
+    def empty_like(self) -> "Macro":
+        return Macro(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.op)
+
+    def __bool__(self) -> bool:
+        return len(self.op) > 0
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int, int, int]:
+        return self.op[i], self.x[i], self.y[i], self.code[i], self.t_ns[i]
+
+    def events(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        return zip(self.op, self.x, self.y, self.code, self.t_ns)
+
+    @property
+    def end_ns(self) -> int:
+        return self.t_ns[-1] if len(self.op) else 0
+
+    def delay_ns(self, i: int) -> int:
+        return self.t_ns[i] - (self.t_ns[i - 1] if i > 0 else 0)
+
+    @property
+    def has_loops(self) -> bool:
+        # memchr nos bytes do opcode, sem criar um int por linha
+        return self.op.tobytes().find(OP_LOOP) >= 0
+
+    def symbol(self, i: int) -> str:
+        code = self.code[i]
+        return self.symbols[code] if code >= 0 else ""
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.op, self.x, self.y, self.code, self.t_ns))
+
+    # ----- JSON (mesmo formato de linhas dos arquivos antigos: atraso em s)
+    def to_json(self) -> List[list]:
+        rows = []
+        anterior = 0
+        for op, x, y, code, t in self.events():
+            delay = (t - anterior) / NS
+            anterior = t
+            if op in KEYBOARD_OPS:
+                rows.append([self.symbols[code], OP_NAMES[op], delay])
+            elif op == OP_CLICK:
+                rows.append(["click", self.symbols[code], delay] + ([x] if x > 1 else []))
+            elif op == OP_SCROLL:
+                rows.append(["scroll", ["para cima" if y > 0 else "para baixo", y], delay])
+            else:
+                rows.append([OP_NAMES[op], [x, y], delay])
+        return rows
+
+    @classmethod
+    def from_json(cls, rows: List[list]) -> "Macro":
+        m = cls()
+        t = 0
+        for row in rows:
+            a, b, d = row[:3]
+            t += int(round(float(d) * NS))  # cada atraso arredondado uma vez, soma inteira
+            if b in ("press", "release"):
+                m.append_key(OP_NAMES.index(b), a, t)
+            elif a == "click":  # 4º campo opcional: cliques múltiplos
+                m.append(OP_CLICK, t, int(row[3]) if len(row) > 3 else 0, 0, m.intern(b))
+            elif a == "scroll":
+                m.append(OP_SCROLL, t, 0, int(b[1]))
+            elif a in ("move", "position", "loop", "wait"):
+                m.append(OP_NAMES.index(a), t, int(b[0]), int(b[1]))
+            else:
+                raise ValueError(f"Evento de macro desconhecido: {a!r}")
+        return m
+
+
+class SessionClock:
+    # Relógio de uma sessão de gravação: perf_counter_ns (monotônico, alta
+    # resolução) relativo ao início da sessão; cada fluxo de dispositivo tem o seu
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+
+    def now(self) -> int:
+        return time.perf_counter_ns() - self.origin
+
+    def since(self, stamp_ns: int) -> int:
+        # perf_counter_ns absoluto (ex.: capturado no callback) -> tempo da sessão
+        return stamp_ns - self.origin
+
+
+# ====== Ring buffer entre os listeners e o consumidor da gravação
+
+class EventRing:
+    # Fila circular pré-alocada, um produtor (thread do hook do SO) e um
+    # consumidor. Sem lock: o produtor só escreve em head, o consumidor só em
+    # tail, e head é publicado depois do registro (atribuições atômicas sob o
+    # GIL). Cheia = o evento é descartado e contado em overruns, nunca bloqueia.
+    # ready (opcional) é sinalizado quando o evento publicado é o único no
+    # ring: o consumidor dorme nele em vez de consultar o ring em intervalos.
+    __slots__ = ("capacity", "_mask", "kind", "t_ns", "a", "b", "obj",
+                 "head", "tail", "overruns", "max_latency_ns", "ready")
+
+    def __init__(self, capacity: int = 1 << 14):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity deve ser potência de 2")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self.kind = array("b", bytes(capacity))
+        self.t_ns = array("q", bytes(8 * capacity))
+        self.a = array("i", bytes(4 * capacity))
+        self.b = array("i", bytes(4 * capacity))
+        self.obj: List[Any] = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.overruns = 0
+        self.max_latency_ns = 0  # pior tempo entre a entrada no callback e a publicação
+        self.ready: Optional[threading.Event] = None
+
+    def push(self, kind: int, t_ns: int, a: int = 0, b: int = 0, obj: Any = None) -> bool:
+        # t_ns = perf_counter_ns() lido na entrada do callback
+        h = self.head
+        if h - self.tail >= self.capacity:
+            self.overruns += 1
+            return False
+        i = h & self._mask
+        self.kind[i] = kind
+        self.t_ns[i] = t_ns
+        self.a[i] = a
+        self.b[i] = b
+        self.obj[i] = obj
+        self.head = h + 1
+        # tail lido depois de publicar: se o consumidor ainda não passou deste
+        # evento, ele pode ter visto o ring vazio e estar dormindo
+        if self.tail == h and self.ready is not None:
+            self.ready.set()
+        lat = time.perf_counter_ns() - t_ns
+        if lat > self.max_latency_ns:
+            self.max_latency_ns = lat
+        return True
+
+    def peek_t(self) -> int:
+        # Instante do evento mais antigo (o ring não pode estar vazio)
+        return self.t_ns[self.tail & self._mask]
+
+    def pop(self, handler: Callable[[int, int, int, int, Any], None]):
+        t = self.tail
+        i = t & self._mask
+        kind, t_ns, a, b, obj = self.kind[i], self.t_ns[i], self.a[i], self.b[i], self.obj[i]
+        self.obj[i] = None  # não segura referências de eventos já consumidos
+        self.tail = t + 1  # slot liberado antes do handler: um erro nele não trava o ring
+        handler(kind, t_ns, a, b, obj)
+
+    def __len__(self) -> int:
+        return self.head - self.tail
+
+    def reset_stats(self):
+        self.overruns = 0
+        self.max_latency_ns = 0
+
+
+class RingConsumer:
+    # Thread que esvazia os rings e faz o trabalho pesado (normalização,
+    # filtros, avisos à UI) fora das threads do hook. drain() também pode ser
+    # chamado por outra thread (ex.: ao parar a gravação) para não perder a
+    # cauda: o lock é só do lado consumidor, os produtores nunca o tocam.
+    # Ocioso, o thread dorme em _ready até um produtor publicar num ring vazio.
+    def __init__(self, rings: List[Tuple[EventRing, Callable[[int, int, int, int, Any], None]]]):
+        self.rings = rings
+        self._lock = threading.RLock()  # reentrante: um handler pode parar a gravação
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        for ring, _ in rings:
+            ring.ready = self._ready
+        self._thread = threading.Thread(target=self._loop, name="recorder-consumer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._ready.set()
+
+    def drain(self) -> int:
+        # Intercala os rings pelo instante capturado no callback: teclado e
+        # mouse chegam ao handler na ordem em que aconteceram. O lote vai só
+        # até o head lido aqui, então um produtor rápido não prende o laço.
+        n = 0
+        with self._lock:
+            fim = [ring.head for ring, _ in self.rings]
+            while True:
+                melhor, melhor_t = -1, 0
+                for k, (ring, _) in enumerate(self.rings):
+                    if ring.tail < fim[k]:
+                        t = ring.peek_t()
+                        if melhor < 0 or t < melhor_t:
+                            melhor, melhor_t = k, t
+                if melhor < 0:
+                    return n
+                ring, handler = self.rings[melhor]
+                ring.pop(handler)
+                n += 1
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.drain():
+                    continue
+                # Limpa e confere de novo antes de dormir: um push entre o
+                # drain e o clear já está no ring e não se perde
+                self._ready.clear()
+                if not any(len(ring) for ring, _ in self.rings):
+                    self._ready.wait()
+            except Exception:
+                traceback.print_exc()
+
+    @property
+    def overruns(self) -> int:
+        return sum(ring.overruns for ring, _ in self.rings)
+
+    @property
+    def max_latency_ns(self) -> int:
+        return max((ring.max_latency_ns for ring, _ in self.rings), default=0)
+
+    def reset_stats(self):
+        for ring, _ in self.rings:
+            ring.reset_stats()
+
+
+# ====== Telemetria amostrada (workers escrevem, a UI lê num timer)
+
+class Telemetry:
+    # Nada é enfileirado: qualquer thread só troca o status e a UI lê o estado
+    # mais recente a uma frequência fixa. Contadores e CPS não passam por
+    # aqui: a UI os lê direto dos jobs ativos do JobScheduler.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = ""
+        self.version = 0  # muda a cada escrita: a UI só redesenha se mudou
+
+    def set_status(self, text: str):
+        with self._lock:
+            self.status = text
+            self.version += 1
+
+    def snapshot(self) -> Tuple[int, str]:
+        with self._lock:
+            return self.version, self.status
+
+
+RATE_WINDOW = 0.5  # janela (s) das taxas de entrada: por frame seriam só ruído
+
+
+class InputMonitor:
+    # Telemetria dos listeners (posição, eventos/s por dispositivo, pior
+    # callback). Os callbacks do hook só escrevem aqui com enabled=True: com o
+    # painel escondido o custo é testar um atributo. Cada campo tem um único
+    # escritor (a thread do seu hook, ou a UI em start() com enabled=False); a
+    # UI só lê, em sample(), no ritmo da tela. Por isso o pior callback é um
+    # máximo por dispositivo desde start(), nunca zerado pela UI.
+    __slots__ = ("enabled", "x", "y", "teclado", "mouse", "lat_teclado", "lat_mouse", "_janela", "_taxas")
+
+    def __init__(self):
+        self.enabled = False
+        self.x = self.y = 0
+        self.teclado = 0  # eventos desde start()
+        self.mouse = 0
+        self.lat_teclado = 0  # pior callback (ns) desde start(), por dispositivo
+        self.lat_mouse = 0
+        self._janela = (0.0, 0, 0)  # (início, teclado, mouse) da janela atual
+        self._taxas = (0.0, 0.0)  # (teclado/s, mouse/s) da última janela
+
+    # ----- Threads do hook (t_ns = perf_counter_ns() na entrada do callback)
+    def key(self, t_ns: int):
+        self.teclado += 1
+        lat = time.perf_counter_ns() - t_ns
+        if lat > self.lat_teclado:
+            self.lat_teclado = lat
+
+    def move(self, x: int, y: int, t_ns: int):
+        self.x = x
+        self.y = y
+        self.button(t_ns)
+
+    def button(self, t_ns: int):
+        self.mouse += 1
+        lat = time.perf_counter_ns() - t_ns
+        if lat > self.lat_mouse:
+            self.lat_mouse = lat
+
+    # ----- UI
+    def start(self, x: int, y: int):
+        # Posição inicial vem de fora: até o primeiro movimento não há evento
+        self.x, self.y = x, y
+        self.teclado = self.mouse = self.lat_teclado = self.lat_mouse = 0
+        self._janela = (time.perf_counter(), 0, 0)
+        self._taxas = (0.0, 0.0)
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def sample(self) -> Tuple[int, int, float, float, int]:
+        # (x, y, teclado ev/s, mouse ev/s, pior callback ns desde start());
+        # taxas fecham a cada RATE_WINDOW
+        agora = time.perf_counter()
+        t0, k0, m0 = self._janela
+        dt = agora - t0
+        if dt >= RATE_WINDOW:
+            k, m = self.teclado, self.mouse
+            self._taxas = ((k - k0) / dt, (m - m0) / dt)
+            self._janela = (agora, k, m)
+        return (self.x, self.y) + self._taxas + (max(self.lat_teclado, self.lat_mouse),)
+
+
+# ====== Agendamento por deadline (sem dependência de Qt/pynput)
+
+# Abaixo desta margem (s) o sleep do SO é impreciso demais: passamos a espera ativa
+SPIN_THRESHOLD = 0.002
+
+
+@dataclass
+class DriftStats:
+    eventos: int = 0
+    soma_abs: float = 0.0
+    maximo: float = 0.0
+    final: float = 0.0  # atraso do último evento em relação ao deadline
+    _media: float = 0.0  # média/variância incrementais (Welford) para o jitter
+    _m2: float = 0.0
+
+    def record(self, erro: float):
+        self.eventos += 1
+        self.soma_abs += abs(erro)
+        delta = erro - self._media
+        self._media += delta / self.eventos
+        self._m2 += delta * (erro - self._media)
+        if abs(erro) > abs(self.maximo):
+            self.maximo = erro
+        self.final = erro
+
+    @property
+    def media(self) -> float:
+        return self.soma_abs / self.eventos if self.eventos else 0.0
+
+    @property
+    def jitter(self) -> float:
+        # desvio padrão do erro de agendamento (s)
+        return math.sqrt(self._m2 / self.eventos) if self.eventos else 0.0
+
+    def summary(self) -> str:
+        return (f"deriva média {self.media * 1000:.3f}ms, "
+                f"máx {self.maximo * 1000:.3f}ms, final {self.final * 1000:.3f}ms")
+
+
+class HeldKeys:
+    # Acompanha as teclas pressionadas pela reprodução para soltá-las na parada
+    # (e durante uma pausa: suspend solta, restore pressiona de novo)
+    def __init__(self, press: Callable[[Any], None], release: Callable[[Any], None]):
+        self._press = press
+        self._release = release
+        self.held: Dict[Any, None] = {}  # dict: conjunto com ordem de inserção
+        self._suspended: List[Any] = []
+
+    def press(self, key: Any):
+        self._press(key)
+        self.held[key] = None
+
+    def release(self, key: Any):
+        self._release(key)
+        self.held.pop(key, None)
+
+    def release_all(self):
+        for key in reversed(list(self.held)):
+            try:
+                self._release(key)
+            except Exception:
+                pass
+        self.held.clear()
+
+    def suspend(self):
+        self._suspended = list(self.held)
+        self.release_all()
+
+    def restore(self):
+        keys, self._suspended = self._suspended, []
+        for key in keys:
+            self.press(key)
+
+
+# ====== Plano de reprodução pré-compilado
+
+Step = Callable[[], None]
+# bind(op, x, y, obj) -> chamada pronta (ou None para ignorar o evento)
+Binder = Callable[[int, int, int, Any], Optional[Step]]
+
+
+@dataclass(frozen=True)
+class PlaybackPlan:
+    offsets: Tuple[float, ...]  # deadline de cada passo (s) relativo ao início da repetição
+    steps: Tuple[Step, ...]
+    duration: float             # duração de uma repetição (s)
+    events: int
+
+
+def _chain(calls: List[Step]) -> Step:
+    def run():
+        for call in calls:
+            call()
+    return run
+
+
+SPEED_MIN = 0.1
+SPEED_MAX = 100.0
+
+
+@dataclass(frozen=True)
+class ReplaySpeed:
+    # factor: multiplicador de velocidade (2.0 = metade do tempo)
+    # compress_idle: "o mais rápido possível" — pausas acima de idle_threshold
+    #   (s, já na velocidade escolhida) viram min_gap
+    # min_gap: intervalo mínimo (s) entre eventos não simultâneos; 0 = sem piso
+    factor: float = 1.0
+    compress_idle: bool = False
+    idle_threshold: float = 0.2
+    min_gap: float = 0.0
+
+
+NORMAL_SPEED = ReplaySpeed()
+
+
+class Retimer:
+    # Instante gravado (ns) -> offset de reprodução (s), evento a evento, para
+    # servir tanto ao plano compilado quanto ao streaming. Eventos gravados no
+    # mesmo instante continuam simultâneos.
+    __slots__ = ("speed", "_escala", "_anterior", "offset")
+
+    def __init__(self, speed: ReplaySpeed = NORMAL_SPEED):
+        self.speed = speed
+        self._escala = 1.0 / (min(SPEED_MAX, max(SPEED_MIN, speed.factor)) * NS)
+        self._anterior = 0
+        self.offset = 0.0
+
+    def __call__(self, t_ns: int) -> float:
+        dt = t_ns - self._anterior
+        self._anterior = t_ns
+        if dt <= 0:
+            return self.offset
+        gap = dt * self._escala
+        sp = self.speed
+        if sp.compress_idle and gap > sp.idle_threshold:
+            gap = sp.min_gap
+        elif gap < sp.min_gap:
+            gap = sp.min_gap
+        self.offset += gap
+        return self.offset
+
+
+def estimate_runtime(source, speed: ReplaySpeed = NORMAL_SPEED) -> float:
+    # Duração de uma repetição (s) com esta velocidade, sem compilar o plano
+    if not speed.compress_idle and speed.min_gap <= 0:
+        return source.end_ns / NS / min(SPEED_MAX, max(SPEED_MIN, speed.factor))
+    retime = Retimer(speed)
+    for ev in unfold_events(source):
+        retime(ev[4])
+    return retime.offset
+
+
+def compile_plan(macro: Macro, bind: Binder, objs: List[Any], speed: ReplaySpeed = NORMAL_SPEED) -> PlaybackPlan:
+    # Resolve botões/teclas, aplica a velocidade e funde eventos simultâneos
+    # num único passo. O laço de execução não ramifica por tipo.
+    # Os deadlines saem direto dos instantes gravados: nada de somar atrasos.
+    offsets: List[float] = []
+    groups: List[List[Step]] = []
+    retime = Retimer(speed)
+    ultimo = None
+    events = 0
+    for op, x, y, code, t in unfold_events(macro):
+        offset = retime(t)  # eventos sem ligação também avançam a linha do tempo
+        call = bind(op, x, y, objs[code] if code >= 0 else None)
+        if call is None:
+            continue
+        events += 1
+        if offset == ultimo:
+            groups[-1].append(call)
+            continue
+        ultimo = offset
+        offsets.append(offset)
+        groups.append([call])
+    steps = tuple(g[0] if len(g) == 1 else _chain(g) for g in groups)
+    return PlaybackPlan(tuple(offsets), steps, retime.offset, events)
+
+
+def plan_steps(plan: PlaybackPlan) -> Iterator[Tuple[float, Optional[Step]]]:
+    # Uma repetição como (offset, passo); o último item (duração, None) marca o fim
+    yield from zip(plan.offsets, plan.steps)
+    yield plan.duration, None
+
+
+def stream_steps(source, bind: Binder, objs: List[Any],
+                 speed: ReplaySpeed = NORMAL_SPEED) -> Iterator[Tuple[float, Optional[Step]]]:
+    # Como plan_steps, mas liga cada evento na hora em que ele é lido: source
+    # (Macro ou MacroFile mapeado) nunca vira um plano inteiro em memória
+    retime = Retimer(speed)
+    for op, x, y, code, t in unfold_events(source):
+        offset = retime(t)
+        call = bind(op, x, y, objs[code] if code >= 0 else None)
+        if call is not None:
+            yield offset, call
+    yield retime.offset, None
+
+
+# ====== Vários jobs num único thread de tempo
+
+JOB_IDLE, JOB_RUNNING, JOB_PAUSED, JOB_STOPPING = "ocioso", "executando", "pausado", "parando"
+# Período mínimo (s) de uma repetição de macro: repetições de duração zero
+# ainda avançam a linha do tempo e não monopolizam o thread do scheduler
+REP_MIN_PERIOD = 0.001
+
+
+class Job:
+    # Um job não dorme: begin/fire devolvem o próximo deadline (perf_counter)
+    # e o JobScheduler decide quando chamá-lo. None = terminou.
+    # Todos os métodos rodam no thread do scheduler.
+    def __init__(self, name: str):
+        self.name = name
+        self.state = JOB_IDLE
+        self.count = 0       # ações executadas (cliques ou eventos da macro)
+        self.reps = 0        # repetições completas (macros)
+        self.stats = DriftStats()
+        self.origin = 0.0
+        self.deadline = 0.0
+        self.stop_latency: Optional[float] = None  # preenchido se foi parado antes de terminar
+        self.error: Optional[Exception] = None  # exceção que encerrou o job (begin/fire)
+        self._gen = 0  # entradas antigas do heap (pausa/parada) são ignoradas
+        self._stop_requested = 0.0
+        self._paused_at = 0.0
+
+    def begin(self, now: float) -> Optional[float]:
+        self.origin = self.deadline = now
+        return now
+
+    def fire(self, now: float) -> Optional[float]:
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+    def suspend(self):
+        # Pausa e retomada: rodam no thread do scheduler, nunca durante um fire
+        pass
+
+    def restore(self):
+        pass
+
+    def shift(self, dt: float):
+        # Depois de uma pausa: a linha do tempo anda junto, sem virar deriva
+        self.origin += dt
+        self.deadline += dt
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    @property
+    def active(self) -> bool:
+        # Parando ainda conta: o nome só fica livre depois do finish (teclas soltas)
+        return self.state != JOB_IDLE
+
+    @property
+    def rate(self) -> float:
+        decorrido = self.elapsed()
+        return self.count / decorrido if decorrido > 0 else 0.0
+
+
+class PacedJob(Job):
+    # Auto clicker: "burst" chamadas de action a cada "interval" segundos,
+    # até "total" chamadas (None = infinito). Deadlines absolutos: o atraso
+    # de uma ação não empurra as seguintes.
+    def __init__(self, name: str, action: Callable[[], None], interval: float,
+                 burst: int = 1, total: Optional[int] = None):
+        super().__init__(name)
+        self.action = action
+        self.interval = interval
+        self.burst = max(1, burst)
+        self.total = total
+
+    def fire(self, now: float) -> Optional[float]:
+        self.stats.record(now - self.deadline)
+        n = self.burst if self.total is None else min(self.burst, self.total - self.count)
+        for _ in range(n):
+            if self.state != JOB_RUNNING:
+                break  # rajadas grandes não atrasam a parada
+            self.action()
+            self.count += 1
+        if self.total is not None and self.count >= self.total:
+            return None
+        # Atrasado (ação mais lenta que o intervalo, thread ocupado): segue
+        # a partir de agora em vez de recuperar os cliques perdidos em rajada
+        self.deadline = max(self.deadline + self.interval, now)
+        return self.deadline
+
+
+class SequenceJob(Job):
+    # Macro: repetition() devolve um iterador novo de (offset, passo) por
+    # repetição (plan_steps/stream_steps). Cada fire executa um passo.
+    # Com held, as teclas seguradas são soltas na pausa e voltam na retomada.
+    def __init__(self, name: str, repetition: Callable[[], Iterator[Tuple[float, Optional[Step]]]],
+                 total: Optional[int] = None, cleanup: Optional[Callable[[], None]] = None,
+                 held: Optional[HeldKeys] = None):
+        super().__init__(name)
+        self.repetition = repetition
+        self.total = total
+        self.cleanup = cleanup
+        self.held = held
+        self.base = 0.0
+        self._it: Iterator[Tuple[float, Optional[Step]]] = iter(())
+        self._step: Optional[Step] = None
+        self._passos = 0  # passos na repetição atual: repetição vazia não entra em laço
+        self.last_deadline = 0.0  # deadline e instante real do último passo executado
+        self.last_fired = 0.0
+
+    def begin(self, now: float) -> Optional[float]:
+        super().begin(now)
+        self.base = now
+        self._it = self.repetition()
+        return self._next()
+
+    def _next(self) -> Optional[float]:
+        while True:
+            offset, step = next(self._it)
+            if step is not None:
+                self._step = step
+                self._passos += 1
+                self.deadline = self.base + offset
+                return self.deadline
+            # Fim da repetição: a próxima parte do deadline final, não do último passo
+            if self._passos == 0:
+                return None
+            self.reps += 1
+            self.base += max(offset, REP_MIN_PERIOD)
+            if self.total is not None and self.reps >= self.total:
+                return None
+            self._passos = 0
+            self._it = self.repetition()
+
+    def fire(self, now: float) -> Optional[float]:
+        self.stats.record(now - self.deadline)
+        self.last_deadline, self.last_fired = self.deadline, now
+        self._step()
+        self.count += 1
+        return self._next()
+
+    def shift(self, dt: float):
+        super().shift(dt)
+        self.base += dt
+
+    def suspend(self):
+        if self.held is not None:
+            self.held.suspend()
+
+    def restore(self):
+        if self.held is not None:
+            self.held.restore()
+
+    def finish(self):
+        self._it = iter(())  # solta o gerador antes do cleanup (ex.: fechar o arquivo mapeado)
+        if self.cleanup is not None:
+            self.cleanup()
+
+
+class JobScheduler:
+    # Multiplexa qualquer número de jobs num único thread: um heap de
+    # (deadline, seq, job, geração). O thread dorme até o deadline mais
+    # próximo (sleep grosso + spin curto) e acorda antes se
+    # o topo do heap mudar. O custo por disparo é O(log n) e nada gira
+    # enquanto todos os jobs esperam. Jobs são identificados pelo nome.
+    def __init__(self, spin: float = SPIN_THRESHOLD):
+        self.spin = spin
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, Job, int]] = []
+        self._seq = itertools.count()
+        self._wake = threading.Event()
+        self._jobs: Dict[str, Job] = {}
+        self._calls: deque = deque()  # suspend/restore a rodar no thread de tempo
+        self.max_stop_latency = 0.0
+        self.on_finished: Optional[Callable[[Job], None]] = None  # chamado no thread do scheduler
+        self._thread = threading.Thread(target=self._loop, name="JobScheduler", daemon=True)
+        self._thread.start()
+
+    # ----- Controle (qualquer thread)
+    def start(self, job: Job) -> bool:
+        # False se já existe um job ativo (ou parando) com o mesmo nome; nesse
+        # caso nada do job roda e o cleanup fica com quem chamou. Aceito, o
+        # finish sempre roda no thread do scheduler, mesmo se begin falhar.
+        with self._lock:
+            atual = self._jobs.get(job.name)
+            if atual is not None and atual.active:
+                return False
+            self._jobs[job.name] = job
+            job._gen += 1
+            try:
+                proximo = job.begin(time.perf_counter())
+            except Exception as e:
+                traceback.print_exc()
+                job.error = e
+                proximo = None
+            job.state = JOB_RUNNING
+            self._push(proximo, job)  # None: vai direto para o finish
+        return True
+
+    def stop(self, name: str) -> bool:
+        # True se o job estava ativo; um job já parando só termina o finish
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None or not job.active:
+                return False
+            if job.state == JOB_STOPPING:
+                return True
+            job._stop_requested = time.perf_counter()
+            job.state = JOB_STOPPING
+            job._gen += 1
+            self._push(0.0, job)  # vai para o topo: a parada não espera o próximo deadline
+        return True
+
+    def stop_all(self) -> int:
+        return sum(self.stop(name) for name in list(self._jobs))
+
+    def pause(self, name: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None or job.state != JOB_RUNNING:
+                return False
+            job.state = JOB_PAUSED
+            job._paused_at = time.perf_counter()
+            job._gen += 1  # sai do heap
+            self._call(job.suspend)
+        return True
+
+    def resume(self, name: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None or job.state != JOB_PAUSED:
+                return False
+            job.shift(time.perf_counter() - job._paused_at)
+            job.state = JOB_RUNNING
+            job._gen += 1
+            self._call(job.restore)  # antes do próximo disparo: a fila roda primeiro
+            self._push(job.deadline, job)
+        return True
+
+    def toggle_pause(self) -> Optional[bool]:
+        # Pausa todos os jobs em execução ou, se não houver, retoma os pausados.
+        # Devolve True (pausou), False (retomou) ou None (nada ativo).
+        ativos = self.active()
+        rodando = [job.name for job in ativos if job.state == JOB_RUNNING]
+        if rodando:
+            for name in rodando:
+                self.pause(name)
+            return True
+        pausados = [job.name for job in ativos if job.state == JOB_PAUSED]
+        for name in pausados:
+            self.resume(name)
+        return False if pausados else None
+
+    def get(self, name: str) -> Optional[Job]:
+        return self._jobs.get(name)
+
+    def running(self, name: str) -> bool:
+        job = self._jobs.get(name)
+        return job is not None and job.active
+
+    def active(self) -> List[Job]:
+        return [job for job in list(self._jobs.values()) if job.active]
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.active())
+
+    def _call(self, fn: Callable[[], None]):
+        # Mesmo thread dos disparos: suspend não corre em paralelo com um fire
+        # que ainda esteja pressionando teclas
+        self._calls.append(fn)
+        self._wake.set()
+
+    def _run_calls(self):
+        while self._calls:
+            try:
+                self._calls.popleft()()
+            except Exception:
+                traceback.print_exc()
+
+    def _push(self, deadline: Optional[float], job: Job):
+        # Chamado com o lock: None (begin sem passos) também passa pelo thread para o finish
+        if deadline is None:
+            job.state = JOB_STOPPING
+            deadline = 0.0
+        heapq.heappush(self._heap, (deadline, next(self._seq), job, job._gen))
+        if self._heap[0][2] is job:
+            self._wake.set()
+
+    # ----- Thread de tempo
+    def _loop(self):
+        while True:
+            with self._lock:
+                topo = self._heap[0] if self._heap else None
+                self._wake.clear()  # um push ou _call depois daqui volta a acordar o laço
+            self._run_calls()
+            if topo is None:
+                self._wake.wait()
+                continue
+            deadline = topo[0]
+            restante = deadline - time.perf_counter()
+            if restante > self.spin and self._wake.wait(restante - self.spin):
+                continue  # o topo mudou
+            while time.perf_counter() < deadline:
+                if self._wake.is_set():
+                    break
+            if time.perf_counter() < deadline:
+                continue
+            with self._lock:
+                if not self._heap or self._heap[0] is not topo:
+                    continue
+                heapq.heappop(self._heap)
+                _, _, job, gen = topo
+                if gen != job._gen:
+                    continue  # pausado, parado ou reagendado desde o push
+                parando = job.state == JOB_STOPPING
+            if parando:
+                self._finish(job)
+            else:
+                self._fire(job, gen)
+
+    def _fire(self, job: Job, gen: int):
+        agora = time.perf_counter()
+        try:
+            proximo = job.fire(agora)
+        except Exception as e:
+            traceback.print_exc()
+            job.error = e
+            proximo = None
+        with self._lock:
+            if job._gen != gen:
+                return  # pausado ou parado durante o disparo: a outra entrada decide
+            if proximo is not None:
+                # Um job atrasado volta ao heap no máximo em "agora": quem
+                # ficou esperando desde antes dispara primeiro
+                heapq.heappush(self._heap, (max(proximo, agora), next(self._seq), job, gen))
+                return
+        self._finish(job)
+
+    def _finish(self, job: Job):
+        try:
+            job.finish()
+        except Exception:
+            traceback.print_exc()
+        with self._lock:
+            if job._stop_requested:
+                job.stop_latency = time.perf_counter() - job._stop_requested
+                self.max_stop_latency = max(self.max_stop_latency, job.stop_latency)
+            job.state = JOB_IDLE
+        if self.on_finished is not None:
+            self.on_finished(job)
+
+
+# ====== Filtro de gravação do mouse
+
+@dataclass
+class MoveFilter:
+    min_interval: float = 0.010  # s: movimentos mais próximos que isso são fundidos
+    min_distance: float = 3.0    # px: idem para deslocamentos menores que isso
+    rdp_tolerance: float = 1.5   # px: tolerância da simplificação do caminho (0 desliga)
+
+
+class MoveCoalescer:
+    # Decide, no momento da gravação, se um movimento novo substitui o último
+    # movimento gravado em vez de virar um evento próprio. Cliques e rolagens
+    # chamam break_run() e nunca são fundidos.
+    def __init__(self, cfg: MoveFilter = None):
+        self.cfg = cfg or MoveFilter()
+        self.anchor = None  # (t_ns, x, y) do movimento que ainda pode absorver outros
+
+    def break_run(self):
+        self.anchor = None
+
+    def should_merge(self, t_ns: int, x: int, y: int) -> bool:
+        a = self.anchor
+        if a is not None and (t_ns - a[0] < self.cfg.min_interval * NS
+                              or math.hypot(x - a[1], y - a[2]) < self.cfg.min_distance):
+            return True
+        self.anchor = (t_ns, x, y)
+        return False
+
+
+def rdp_keep(points: List[Tuple[int, int]], tolerance: float) -> List[bool]:
+    # Ramer–Douglas–Peucker iterativo (sem recursão: caminhos podem ter milhares de pontos)
+    n = len(points)
+    keep = [False] * n
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        x1, y1 = points[first]
+        x2, y2 = points[last]
+        dx, dy = x2 - x1, y2 - y1
+        norm = math.hypot(dx, dy)
+        pior, idx = -1.0, first
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if norm:
+                dist = abs(dy * (px - x1) - dx * (py - y1)) / norm
+            else:
+                dist = math.hypot(px - x1, py - y1)
+            if dist > pior:
+                pior, idx = dist, i
+        if pior > tolerance:
+            keep[idx] = True
+            stack.append((first, idx))
+            stack.append((idx, last))
+    return keep
+
+
+def simplify_mouse_macro(macro: Macro, tolerance: float) -> Macro:
+    # Simplifica cada sequência de movimentos consecutivos. Os pontos mantidos
+    # conservam seus instantes, então a duração total não muda.
+    out = macro.empty_like()
+    ops, xs, ys = macro.op, macro.x, macro.y
+    i, n = 0, len(macro)
+    while i < n:
+        if ops[i] != OP_MOVE or tolerance <= 0:
+            out.append_from(macro, i)
+            i += 1
+            continue
+        j = i
+        while j < n and ops[j] == OP_MOVE:
+            j += 1
+        keep = rdp_keep(list(zip(xs[i:j], ys[i:j])), tolerance)
+        for k in range(i, j):
+            if keep[k - i]:
+                out.append_from(macro, k)
+        i = j
+    return out
+
+
+# ====== Laços: repetições gravadas dobradas em corpo + marcador
+
+LOOP_TOLERANCE = 0.05  # s: diferença máxima de tempo entre repetições "iguais"
+LOOP_MAX_BODY = 256    # linhas no corpo de um laço (limita busca e buffer da reprodução)
+LOOP_MAX_CANDIDATES = 64  # comprimentos testados por posição
+LOOP_MIN_BODY = 2      # corpo mínimo: um press + release
+LOOP_MIN_SAVED = 16    # linhas economizadas mínimas: repetições curtas de digitação comum ficam como estão
+
+
+def unfold_events(source) -> Iterator[Tuple[int, int, int, int, int]]:
+    # Eventos na ordem de reprodução: cada OP_LOOP repete as y linhas
+    # anteriores até completar x vezes, com as repetições espaçadas igualmente
+    # até o instante do marcador. Só o corpo fica em memória: a macro dobrada
+    # (Macro ou MacroFile) nunca é expandida.
+    if not source.has_loops:
+        yield from source.events()
+        return
+    corpo: deque = deque(maxlen=LOOP_MAX_BODY)
+    for ev in source.events():
+        if ev[0] != OP_LOOP:
+            corpo.append(ev)
+            yield ev
+            continue
+        _, vezes, n, _, t_fim = ev
+        if vezes < 2 or not 0 < n <= len(corpo):
+            raise ValueError(f"laço inválido: {n} linhas x{vezes}")
+        body = list(corpo)[-n:]
+        total = t_fim - body[-1][4]
+        for k in range(1, vezes):
+            d = total * k // (vezes - 1)
+            for op, x, y, code, t in body:
+                yield op, x, y, code, t + d
+        corpo.clear()  # laços não se sobrepõem
+
+
+def played_events(source) -> int:
+    # Ações enviadas por repetição (Macro ou MacroFile): laços contam todas as
+    # voltas, marcadores e OP_WAIT não contam. Conta sem desdobrar os laços.
+    if isinstance(source, Macro) and not source.has_loops:
+        return len(source) - source.op.count(OP_WAIT)
+    total = 0
+    corpo: deque = deque(maxlen=LOOP_MAX_BODY)  # 1 = a linha do corpo é uma ação
+    for op, x, y, _, _ in source.events():
+        if op == OP_LOOP:
+            total += (x - 1) * sum(list(corpo)[-y:])
+            corpo.clear()
+            continue
+        acao = op != OP_WAIT
+        corpo.append(acao)
+        total += acao
+    return total
+
+
+def loop_regions(macro: Macro) -> List[Tuple[int, int]]:
+    # (primeira linha do corpo, linha do marcador) de cada laço
+    if not macro.has_loops:
+        return []
+    return [(i - macro.y[i], i) for i, op in enumerate(macro.op) if op == OP_LOOP]
+
+
+def _repeats(macro: Macro, i: int, n: int, size: int, tol: int) -> int:
+    # Quantas vezes seguidas as linhas i..i+size-1 se repetem a partir de i,
+    # com as mesmas ações e de modo que a reprodução desdobrada fique a até
+    # tol (ns) de cada instante gravado. unfold_events desloca a repetição k
+    # de k * P, com P = total / (vezes - 1): cada repetição restringe P a um
+    # intervalo e vezes para de crescer na primeira que não cabe.
+    ops, xs, ys, codes, ts = macro.op, macro.x, macro.y, macro.code, macro.t_ns
+    fim = i + size
+    corpo = ts[i:fim]
+    # lo <= P < hi como frações (numerador, denominador), só com inteiros.
+    # P >= duração do corpo: os instantes desdobrados nunca voltam.
+    lo_n, lo_d = corpo[-1] - corpo[0], 1
+    hi_n, hi_d = None, 1
+    vezes, s = 1, fim
+    while s + size <= n:
+        e = s + size
+        if ops[s:e] != ops[i:fim] or codes[s:e] != codes[i:fim] or xs[s:e] != xs[i:fim] or ys[s:e] != ys[i:fim]:
+            break
+        desloc = [t - b for t, b in zip(ts[s:e], corpo)]
+        k = vezes
+        # floor(k * P) dentro de [max - tol, min + tol] para todo evento da repetição
+        piso, teto = max(desloc) - tol, min(desloc) + tol + 1
+        if piso * lo_d > lo_n * k:
+            lo_n, lo_d = piso, k
+        if hi_n is None or teto * hi_d < hi_n * k:
+            hi_n, hi_d = teto, k
+        # P se esta for a última repetição: todas as anteriores ainda cabem?
+        total = desloc[-1]
+        if total * lo_d < lo_n * k or total * hi_d >= hi_n * k:
+            break
+        vezes += 1
+        s = e
+    return vezes
+
+
+def _fold_range(macro: Macro, out: Macro, a: int, b: int, tol: int, max_body: int,
+                min_body: int, min_saved: int):
+    ops, xs, ys, codes, ts = macro.op, macro.x, macro.y, macro.code, macro.t_ns
+    # Cada linha vira um id inteiro da sua ação: os filtros comparam ints, não tuplas
+    ids_de: Dict[tuple, int] = {}
+    ids = [ids_de.setdefault((ops[r], codes[r], xs[r], ys[r]), len(ids_de)) for r in range(a, b)]
+    # Janela deslizante (i, i + max_body]: id -> posições, cada linha entra e sai uma vez
+    janela: Dict[int, List[int]] = {}
+    topo = a + 1  # próxima linha a entrar na janela
+
+    i = a
+    while i < b:
+        while topo < b and topo <= i + max_body:
+            janela.setdefault(ids[topo - a], []).append(topo)
+            topo += 1
+        melhor, tamanho, vezes = 0, 0, 0
+        posicoes = janela.get(ids[i - a], ())
+        inicio = bisect_right(posicoes, i)
+        for p in posicoes[inicio:inicio + LOOP_MAX_CANDIDATES]:
+            size = p - i
+            if i + 2 * size > b:
+                break
+            if size < min_body:
+                continue
+            if tamanho and size % tamanho == 0:
+                continue  # múltiplo do melhor corpo: cobriria o mesmo trecho com menos ganho
+            # Menos de vezes_min repetições não chega a min_saved: a última
+            # delas precisa começar e terminar com as mesmas ações do corpo
+            # (filtro barato antes de comparar fatias; descarta quase todo ruído)
+            vezes_min = 1 + -(-(min_saved + 1) // size)
+            ultima = i + (vezes_min - 1) * size - a
+            if (ultima + size > b - a or ids[ultima] != ids[i - a]
+                    or ids[ultima + size - 1] != ids[p - 1 - a]):
+                continue
+            v = _repeats(macro, i, b, size, tol)
+            economia = size * (v - 1) - 1  # linhas removidas menos o marcador
+            if economia > melhor and economia >= min_saved:
+                melhor, tamanho, vezes = economia, size, v
+        if melhor <= 0:
+            out.append_from(macro, i)
+            proximo = i + 1
+        else:
+            for k in range(i, i + tamanho):
+                out.append_from(macro, k)
+            proximo = i + tamanho * vezes
+            out.append(OP_LOOP, ts[proximo - 1], vezes, tamanho)
+        # Tira da janela as linhas que ficaram para trás
+        for r in range(i + 1, min(proximo + 1, topo)):
+            lista = janela[ids[r - a]]
+            lista.pop(0)
+            if not lista:
+                del janela[ids[r - a]]
+        i = proximo
+
+
+def fold_loops(macro: Macro, tolerance: float = LOOP_TOLERANCE, max_body: int = LOOP_MAX_BODY,
+               min_body: int = LOOP_MIN_BODY, min_saved: int = LOOP_MIN_SAVED) -> Macro:
+    # Dobra repetições seguidas de um mesmo trecho (mesmas ações, tempos
+    # relativos dentro da tolerância) em corpo + OP_LOOP. Guloso da esquerda
+    # para a direita: em cada posição fica o corpo que mais economiza linhas,
+    # se tiver pelo menos min_body linhas e economizar pelo menos min_saved.
+    # O marcador leva o instante do último evento da última repetição, então
+    # tudo que vem depois mantém os instantes gravados. Laços já dobrados
+    # ficam como estão (não há laços aninhados).
+    out = macro.empty_like()
+    tol = int(tolerance * NS)
+    inicio = 0
+    for corpo, marcador in loop_regions(macro) + [(len(macro), len(macro) - 1)]:
+        _fold_range(macro, out, inicio, corpo, tol, max_body, min_body, min_saved)
+        for k in range(corpo, marcador + 1):
+            out.append_from(macro, k)
+        inicio = marcador + 1
+    return out
@@ -0,0 +1,261 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from macro_engine import (
+    Macro, NS, OP_PRESS, OP_RELEASE, OP_MOVE, OP_CLICK, OP_SCROLL, OP_LOOP, OP_WAIT,
+    LOOP_MAX_BODY, unfold_events, loop_regions,
+)
+
+# ====== Scripts de macro (texto -> Macro)
+# Compilado uma vez para a mesma Macro que a gravação produz, então segue
+# pelo mesmo compile_plan/stream_steps. Um comando por linha:
+#
+#   # comentário
+#   set passo = 50ms          variáveis: $passo em qualquer argumento
+#   press a | release a | tap Key.space
+#   tap #                     (# logo depois de press/release/tap é a tecla)
+#   click [left|right|middle] [vezes]
+#   move 100 200
+#   scroll 3                  (negativo = para baixo)
+#   wait 1.5s | wait 200ms | wait 200   (sem unidade = ms)
+#   repeat 10 {
+#       tap e
+#       wait $passo
+#   }
+#
+# Os eventos de uma linha acontecem no instante atual; só wait avança o
+# tempo. repeat vira um laço OP_LOOP (corpo + contador) quando o corpo cabe
+# em LOOP_MAX_BODY linhas, senão é expandido.
+
+SCRIPT_EXTENSION = ".acs"
+MAX_SCRIPT_ROWS = 5_000_000  # linhas da Macro compilada (laços contam uma vez)
+MAX_ERRORS = 20
+
+# Nomes de Key do pynput aceitos sem o prefixo "Key." (o módulo não importa pynput)
+KEY_NAMES = frozenset(
+    "alt alt_l alt_r alt_gr backspace caps_lock cmd cmd_l cmd_r ctrl ctrl_l ctrl_r delete down "
+    "end enter esc home insert left menu num_lock page_down page_up pause print_screen right "
+    "scroll_lock shift shift_l shift_r space tab up media_play_pause media_volume_mute "
+    "media_volume_down media_volume_up media_previous media_next".split()
+) | frozenset(f"f{i}" for i in range(1, 25))
+BUTTONS = {"left": "left", "right": "right", "middle": "middle",
+           "esquerdo": "left", "direito": "right", "meio": "middle"}
+
+_DURATION = re.compile(r"^(\d+(?:\.\d*)?|\.\d+)(us|ms|s|min)?$")
+_UNITS = {"us": 1_000, "ms": 1_000_000, "s": NS, "min": 60 * NS, None: 1_000_000}
+_NAME = re.compile(r"^[A-Za-z_]\w*$")
+_KEY_COMMANDS = ("press", "release", "tap")
+
+
+def expanded_len(macro: Macro) -> int:
+    # Eventos reproduzidos, sem desdobrar: cada marcador soma (vezes - 1) corpos
+    total = len(macro)
+    for _, marcador in loop_regions(macro):
+        total += (macro.x[marcador] - 1) * macro.y[marcador] - 1
+    return total
+
+
+class ScriptError(ValueError):
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        super().__init__("\n".join(f"linha {n}: {msg}" for n, msg in errors))
+
+
+class _Erro(Exception):
+    pass
+
+
+@dataclass
+class Stmt:
+    line: int
+    cmd: str
+    args: List[str]
+    body: List["Stmt"] = field(default_factory=list)
+
+
+def _tokens(linha: str) -> List[str]:
+    # Um token começando com # abre um comentário até o fim da linha, exceto
+    # o "#" sozinho no lugar da tecla de press/release/tap
+    tokens = linha.split()
+    for i, tok in enumerate(tokens):
+        if tok.startswith("#") and not (i == 1 and tok == "#" and tokens[0].lower() in _KEY_COMMANDS):
+            return tokens[:i]
+    return tokens
+
+
+def parse_script(text: str) -> List[Stmt]:
+    # Texto -> árvore de comandos; blocos só por "repeat N {" ... "}"
+    raiz: List[Stmt] = []
+    pilha: List[Tuple[Stmt, List[Stmt]]] = []
+    atual = raiz
+    erros: List[Tuple[int, str]] = []
+    for n, linha in enumerate(text.splitlines(), 1):
+        tokens = _tokens(linha)
+        if not tokens:
+            continue
+        if tokens == ["}"]:
+            if not pilha:
+                erros.append((n, "'}' sem 'repeat' aberto"))
+                continue
+            pilha.pop()
+            atual = pilha[-1][0].body if pilha else raiz
+            continue
+        st = Stmt(n, tokens[0].lower(), tokens[1:])
+        atual.append(st)
+        if st.cmd == "repeat":
+            if not st.args or st.args[-1] != "{":
+                erros.append((n, "esperado 'repeat N {'"))
+                continue
+            st.args.pop()
+            pilha.append((st, atual))
+            atual = st.body
+    for st, _ in pilha:
+        erros.append((st.line, "'{' sem '}' correspondente"))
+    if erros:
+        raise ScriptError(sorted(erros)[:MAX_ERRORS])
+    return raiz
+
+
+class _Compiler:
+    def __init__(self):
+        self.vars: Dict[str, str] = {}
+        self.errors: List[Tuple[int, str]] = []
+        self.rows = 0
+
+    # ----- Argumentos
+    def value(self, token: str) -> str:
+        if token.startswith("$"):
+            nome = token[1:]
+            if nome not in self.vars:
+                raise _Erro(f"variável não definida: {token}")
+            return self.vars[nome]
+        return token
+
+    def args(self, st: Stmt, minimo: int, maximo: int) -> List[str]:
+        if not minimo <= len(st.args) <= maximo:
+            esperado = str(minimo) if minimo == maximo else f"{minimo} a {maximo}"
+            raise _Erro(f"'{st.cmd}' espera {esperado} argumento(s), recebeu {len(st.args)}")
+        return [self.value(a) for a in st.args]
+
+    @staticmethod
+    def integer(token: str, nome: str, minimo: int = -(1 << 31), maximo: int = (1 << 31) - 1) -> int:
+        try:
+            v = int(token)
+        except ValueError:
+            raise _Erro(f"{nome} deve ser inteiro: {token!r}") from None
+        if not minimo <= v <= maximo:
+            raise _Erro(f"{nome} fora do intervalo ({minimo} a {maximo}): {v}")
+        return v
+
+    @staticmethod
+    def duration(token: str) -> int:
+        m = _DURATION.match(token.lower())
+        if m is None:
+            raise _Erro(f"duração inválida: {token!r} (ex.: 250ms, 1.5s, 2min)")
+        return int(round(float(m.group(1)) * _UNITS[m.group(2)]))
+
+    @staticmethod
+    def key(token: str) -> str:
+        # Mesmos nomes da tabela de símbolos das macros gravadas
+        if len(token) == 1 or (token.startswith("<") and token.endswith(">")):
+            return token
+        nome = token[4:] if token.startswith("Key.") else token.lower()
+        if nome not in KEY_NAMES:
+            raise _Erro(f"tecla desconhecida: {token!r}")
+        return f"Key.{nome}"
+
+    # ----- Comandos
+    def block(self, stmts: List[Stmt], out: Macro, t: int) -> int:
+        # Emite os comandos em out a partir do instante t; devolve o instante final
+        for st in stmts:
+            try:
+                t = self.stmt(st, out, t)
+            except _Erro as e:
+                self.errors.append((st.line, str(e)))
+            if self.rows > MAX_SCRIPT_ROWS:
+                self.errors.append((st.line, f"script grande demais (mais de {MAX_SCRIPT_ROWS:,} linhas)"))
+                raise ScriptError(self.errors[:MAX_ERRORS])
+        return t
+
+    def emit(self, out: Macro, op: int, t: int, x: int = 0, y: int = 0, name: Optional[str] = None):
+        out.append(op, t, x, y, out.intern(name) if name is not None else -1)
+        self.rows += 1
+
+    def stmt(self, st: Stmt, out: Macro, t: int) -> int:
+        cmd = st.cmd
+        if cmd == "set":
+            partes = [a for a in st.args if a != "="]
+            if len(partes) != 2 or not _NAME.match(partes[0]):
+                raise _Erro("esperado 'set nome = valor'")
+            self.vars[partes[0]] = self.value(partes[1])
+        elif cmd in ("press", "release", "tap"):
+            (tecla,) = self.args(st, 1, 1)
+            nome = self.key(tecla)
+            if cmd != "release":
+                self.emit(out, OP_PRESS, t, name=nome)
+            if cmd != "press":
+                self.emit(out, OP_RELEASE, t, name=nome)
+        elif cmd == "click":
+            a = self.args(st, 0, 2)
+            botao = BUTTONS.get(a[0].lower()) if a else "left"
+            if botao is None:
+                raise _Erro(f"botão desconhecido: {a[0]!r} (left, right, middle)")
+            vezes = self.integer(a[1], "vezes", 1, 100) if len(a) > 1 else 1
+            self.emit(out, OP_CLICK, t, x=vezes if vezes > 1 else 0, name=f"Button.{botao}")
+        elif cmd == "move":
+            x, y = self.args(st, 2, 2)
+            self.emit(out, OP_MOVE, t, self.integer(x, "x"), self.integer(y, "y"))
+        elif cmd == "scroll":
+            (dy,) = self.args(st, 1, 1)
+            self.emit(out, OP_SCROLL, t, 0, self.integer(dy, "rolagem"))
+        elif cmd == "wait":
+            (d,) = self.args(st, 1, 1)
+            t += self.duration(d)
+        elif cmd == "repeat":
+            (n,) = self.args(st, 1, 1)
+            t = self.repeat(st, out, t, self.integer(n, "repetições", 0))
+        else:
+            raise _Erro(f"comando desconhecido: {st.cmd!r}")
+        return t
+
+    def repeat(self, st: Stmt, out: Macro, t: int, vezes: int) -> int:
+        # O corpo é compilado uma vez numa linha do tempo própria (0..periodo)
+        corpo = Macro()
+        periodo = self.block(st.body, corpo, 0)
+        if vezes == 0 or not corpo:
+            return t + vezes * periodo
+        if corpo.has_loops and expanded_len(corpo) <= LOOP_MAX_BODY:
+            plano = Macro()  # laço interno pequeno: desdobrado para caber num laço só
+            for op, x, y, code, tt in unfold_events(corpo):
+                plano.append(op, tt, x, y, plano.intern(corpo.symbols[code]) if code >= 0 else -1)
+            corpo = plano
+        if vezes > 1 and not corpo.has_loops and len(corpo) <= LOOP_MAX_BODY:
+            for i in range(len(corpo)):
+                out.append_from(corpo, i, t + corpo.t_ns[i])
+            # Marcador no último evento da última repetição (mesma regra de fold_loops)
+            self.emit(out, OP_LOOP, t + corpo.end_ns + (vezes - 1) * periodo, vezes, len(corpo))
+            return t + vezes * periodo
+        if self.rows + vezes * len(corpo) > MAX_SCRIPT_ROWS:
+            raise _Erro(f"repeat expande para {vezes * len(corpo):,} linhas (máx. {MAX_SCRIPT_ROWS:,})")
+        for k in range(vezes):
+            base = t + k * periodo
+            for i in range(len(corpo)):
+                out.append_from(corpo, i, base + corpo.t_ns[i])
+        self.rows += (vezes - 1) * len(corpo)  # a primeira cópia já foi contada no corpo
+        return t + vezes * periodo
+
+
+def compile_script(text: str) -> Macro:
+    # Erros de sintaxe e de compilação saem juntos, com o número da linha
+    stmts = parse_script(text)
+    comp = _Compiler()
+    out = Macro()
+    fim = comp.block(stmts, out, 0)
+    if not comp.errors and not out:
+        comp.errors.append((1, "o script não gera nenhum evento"))
+    if comp.errors:
+        raise ScriptError(comp.errors[:MAX_ERRORS])
+    if fim > out.end_ns:
+        out.append(OP_WAIT, fim)  # wait no fim: a próxima repetição respeita a pausa
+    return out
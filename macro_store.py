@@ -0,0 +1,440 @@
+import os
+import re
+import json
+import shutil
+import mmap
+import hashlib
+import struct
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Iterator, Tuple, Optional, Callable, BinaryIO
+
+from macro_engine import Macro, OP_NAMES, OP_PRESS, OP_RELEASE, OP_CLICK, OP_LOOP, LOOP_MAX_BODY
+
+# ====== Formato binário de macro (.acm)
+# Cabeçalho fixo, tabela de símbolos (nomes de teclas/botões) e um registro de
+# largura fixa por evento. Com compressão, os registros vão em blocos zlib
+# independentes, listados num índice, para a leitura continuar sendo por
+# streaming (um bloco descomprimido por vez).
+#
+#   cabeçalho  <8s H H I I I q>  magic, versão, flags, eventos, símbolos, eventos/bloco, fim (ns)
+#   símbolos   n x <H> + utf-8
+#   [nome]     <H> + utf-8        nome do perfil (só com FLAG_NAME, versão 2)
+#   [índice]   blocos x <Q I>    deslocamento, tamanho comprimido (só com FLAG_ZLIB)
+#   registros  eventos x <b 3x i i i q>  op, x, y, code, t_ns
+
+MAGIC = b"ACMACRO\0"
+VERSION = 2
+FLAG_ZLIB = 1
+FLAG_LOOPS = 2  # há marcadores OP_LOOP: a reprodução precisa desdobrar
+FLAG_NAME = 4   # o nome do perfil vem depois dos símbolos: o índice pode ser refeito dos arquivos
+EXTENSION = ".acm"
+
+HEADER = struct.Struct("<8sHHIIIq")
+SYMBOL_LEN = struct.Struct("<H")
+BLOCK_ENTRY = struct.Struct("<QI")
+RECORD = struct.Struct("<b3xiiiq")  # 24 bytes, mesma ordem de Macro.events()
+
+BLOCK_EVENTS = 4096
+
+
+class MacroFormatError(ValueError):
+    pass
+
+
+_NEEDS_SYMBOL = (OP_PRESS, OP_RELEASE, OP_CLICK)
+
+
+def _encode_symbols(symbols: List[str]) -> bytes:
+    out = bytearray()
+    for name in symbols:
+        raw = name.encode("utf-8")
+        out += SYMBOL_LEN.pack(len(raw))
+        out += raw
+    return bytes(out)
+
+
+def _read_string(mm, off: int) -> Tuple[str, int]:
+    (size,) = SYMBOL_LEN.unpack_from(mm, off)
+    off += SYMBOL_LEN.size
+    return bytes(mm[off:off + size]).decode("utf-8"), off + size
+
+
+def _records(macro: Macro, start: int, stop: int) -> bytes:
+    buf = bytearray(RECORD.size * (stop - start))
+    pack = RECORD.pack_into
+    off = 0
+    op, xs, ys, code, ts = macro.op, macro.x, macro.y, macro.code, macro.t_ns
+    for i in range(start, stop):
+        pack(buf, off, op[i], xs[i], ys[i], code[i], ts[i])
+        off += RECORD.size
+    return bytes(buf)
+
+
+def write_atomic(path: str, write: Callable[[BinaryIO], None]):
+    # Escreve num temporário ao lado e troca com os.replace. O conteúdo vai ao
+    # disco antes do rename: um crash deixa o arquivo antigo ou o novo
+    # inteiro, nunca um pedaço.
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+
+def write_macro(path: str, macro: Macro, compress: bool = False, level: int = 6,
+                block_events: int = BLOCK_EVENTS, name: str = ""):
+    # name: nome do perfil, guardado no arquivo (vazio = sem nome)
+    n = len(macro)
+    flags = (FLAG_ZLIB if compress else 0) | (FLAG_LOOPS if macro.has_loops else 0) | (FLAG_NAME if name else 0)
+
+    def write(f: BinaryIO):
+        f.write(HEADER.pack(MAGIC, VERSION, flags, n, len(macro.symbols), block_events, macro.end_ns))
+        f.write(_encode_symbols(macro.symbols))
+        if name:
+            f.write(_encode_symbols([name]))
+        if not compress:
+            for start in range(0, n, block_events):
+                f.write(_records(macro, start, min(n, start + block_events)))
+            return
+        blocos = [zlib.compress(_records(macro, s, min(n, s + block_events)), level)
+                  for s in range(0, n, block_events)]
+        off = f.tell() + BLOCK_ENTRY.size * len(blocos)
+        for b in blocos:
+            f.write(BLOCK_ENTRY.pack(off, len(b)))
+            off += len(b)
+        for b in blocos:
+            f.write(b)
+
+    write_atomic(path, write)
+
+
+class MacroFile:
+    # Macro lida direto de um arquivo mapeado em memória. Tem a mesma interface
+    # de leitura usada pela reprodução (symbols, end_ns, len, events()), mas os
+    # eventos são decodificados sob demanda: nada é materializado. Os registros
+    # são conferidos uma vez na abertura: um arquivo corrompido falha aqui, com
+    # MacroFormatError, e nunca no meio da reprodução.
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            try:
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._parse()
+                self._check()
+            except MacroFormatError:
+                raise
+            except (ValueError, struct.error, zlib.error) as e:
+                # mmap de arquivo vazio, tabela de símbolos truncada, bloco zlib inválido...
+                raise MacroFormatError(f"{path}: arquivo inválido ({e})") from e
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        mm = self._mm
+        if len(mm) < HEADER.size:
+            raise MacroFormatError(f"{self.path}: arquivo truncado")
+        magic, version, flags, n, n_sym, block_events, end_ns = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise MacroFormatError(f"{self.path}: não é um arquivo de macro")
+        if version > VERSION:
+            raise MacroFormatError(f"{self.path}: versão {version} não suportada")
+        self.flags, self.count, self.block_events, self.end_ns = flags, n, block_events, end_ns
+
+        off = HEADER.size
+        self.symbols: List[str] = []
+        for _ in range(n_sym):
+            symbol, off = _read_string(mm, off)
+            self.symbols.append(symbol)
+        self.name = ""  # nome do perfil (arquivos da versão 1 e exportados não têm)
+        if flags & FLAG_NAME:
+            self.name, off = _read_string(mm, off)
+
+        n_blocks = (n + block_events - 1) // block_events if n else 0
+        self._blocks: Optional[List[Tuple[int, int]]] = None
+        if flags & FLAG_ZLIB:
+            self._blocks = [BLOCK_ENTRY.unpack_from(mm, off + k * BLOCK_ENTRY.size) for k in range(n_blocks)]
+            fim = self._blocks[-1][0] + self._blocks[-1][1] if n_blocks else off
+        else:
+            self._data = off
+            fim = off + n * RECORD.size
+        if fim > len(mm):
+            raise MacroFormatError(f"{self.path}: arquivo truncado")
+
+    def _check(self):
+        # Faixas de op/code e pareamento dos laços (mesmas regras de unfold_events)
+        n_ops, n_sym = len(OP_NAMES), len(self.symbols)
+        lido = 0
+        corpo = 0  # linhas desde o último marcador
+        for i, (op, x, y, code, _) in enumerate(self.events()):
+            lido += 1
+            if not 0 <= op < n_ops:
+                raise MacroFormatError(f"{self.path}: evento {i}: op inválido ({op})")
+            if code >= n_sym or code < (0 if op in _NEEDS_SYMBOL else -1):
+                raise MacroFormatError(f"{self.path}: evento {i}: símbolo inválido ({code})")
+            if op != OP_LOOP:
+                corpo += 1
+                continue
+            if not self.has_loops:
+                raise MacroFormatError(f"{self.path}: evento {i}: laço sem a flag de laços")
+            if x < 2 or not 0 < y <= min(corpo, LOOP_MAX_BODY):
+                raise MacroFormatError(f"{self.path}: evento {i}: laço inválido ({y} linhas x{x})")
+            corpo = 0
+        if lido != self.count:
+            raise MacroFormatError(f"{self.path}: {lido} eventos, cabeçalho diz {self.count}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    @property
+    def has_loops(self) -> bool:
+        return bool(self.flags & FLAG_LOOPS)
+
+    def events(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        view = memoryview(self._mm)
+        if self._blocks is None:
+            yield from RECORD.iter_unpack(view[self._data:self._data + self.count * RECORD.size])
+            return
+        for off, size in self._blocks:
+            yield from RECORD.iter_unpack(zlib.decompress(view[off:off + size]))
+
+    def to_macro(self) -> Macro:
+        m = Macro(self.symbols)
+        append = m.append
+        for op, x, y, code, t in self.events():
+            append(op, t, x, y, code)
+        return m
+
+    def close(self):
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # ainda há um iterador de events() vivo; o GC fecha depois
+        self._file.close()
+
+    def __enter__(self) -> "MacroFile":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_macro(path: str) -> Macro:
+    with MacroFile(path) as mf:
+        return mf.to_macro()
+
+
+# ====== Loja de perfis: um .acm por perfil + índice
+# Salvar/excluir um perfil reescreve só o arquivo dele e o índice (pequeno),
+# ambos de forma atômica. A inicialização lê apenas o índice; o corpo de uma
+# macro só é decodificado quando o perfil é carregado.
+
+PROFILES_DIR = "macro_profiles"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+# Limite do cache de macros decodificadas, em eventos (~21 bytes cada)
+CACHE_MAX_EVENTS = 2_000_000
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MacroCache:
+    # LRU de macros decodificadas, limitado pelo total de eventos (não pelo
+    # número de entradas: um perfil de horas vale por milhares de curtos).
+    # A chave inclui o hash do conteúdo, então um perfil regravado nunca é
+    # servido velho. As macros são compartilhadas: quem as recebe não as altera.
+    def __init__(self, max_events: int = CACHE_MAX_EVENTS):
+        self.max_events = max_events
+        self.events = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Tuple[str, str], Macro]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Optional[Macro]:
+        macro = self._items.get(key)
+        if macro is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return macro
+
+    def put(self, key: Tuple[str, str], macro: Macro):
+        if len(macro) > self.max_events:
+            return  # maior que o cache inteiro: não expulsa tudo por uma entrada
+        velho = self._items.pop(key, None)
+        if velho is not None:
+            self.events -= len(velho)
+        self._items[key] = macro
+        self.events += len(macro)
+        while self.events > self.max_events:
+            _, expulso = self._items.popitem(last=False)
+            self.events -= len(expulso)
+
+    def discard(self, name: str):
+        for key in [k for k in self._items if k[0] == name]:
+            self.events -= len(self._items.pop(key))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class ProfileStore:
+    def __init__(self, root: str, cache: Optional[MacroCache] = None):
+        self.root = root
+        self.cache = cache if cache is not None else MacroCache()
+        self._index: Dict[str, Dict[str, object]] = {}
+        self.loaded = False  # antes do load() uma escrita apagaria o índice existente
+
+    # ----- Índice
+    def load(self):
+        # Só o índice. Se estiver corrompido, guarda uma cópia, reconstrói o
+        # índice a partir dos .acm da pasta e levanta ValueError para avisar
+        path = os.path.join(self.root, INDEX_FILE)
+        self._index = {}
+        if not os.path.exists(path):
+            self.loaded = True
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            perfis = data.get("perfis") if isinstance(data, dict) else None
+            if not isinstance(perfis, dict):
+                raise ValueError("estrutura inesperada")
+        except ValueError as e:  # JSONDecodeError e UnicodeDecodeError incluídos
+            backup = self._backup_index(path)
+            n = self._rebuild_index()
+            raise ValueError(f"índice de perfis corrompido ({e}); cópia em {backup}, "
+                             f"{n} perfis recuperados dos arquivos") from e
+        self._index = perfis
+        self.loaded = True
+
+    @staticmethod
+    def _backup_index(path: str) -> str:
+        # O nome leva o hash do conteúdo: a próxima gravação do índice não
+        # apaga o original, e abrir de novo o mesmo índice não duplica a cópia
+        backup = f"{path}.{file_hash(path)[:8]}.corrompido"
+        if not os.path.exists(backup):
+            shutil.copyfile(path, backup)
+        return backup
+
+    def _rebuild_index(self) -> int:
+        # O nome de cada perfil vem do próprio .acm. Arquivos antigos, sem
+        # nome, voltam com a parte legível do nome do arquivo; se dois
+        # arquivos derem o mesmo nome, cada um fica com o nome do arquivo.
+        achados: Dict[str, List[Tuple[str, int]]] = {}
+        for arquivo in sorted(os.listdir(self.root)):
+            if not arquivo.endswith(EXTENSION):
+                continue
+            try:
+                with MacroFile(os.path.join(self.root, arquivo)) as mf:
+                    nome = mf.name or arquivo[:-len(EXTENSION)].rsplit("-", 1)[0]
+                    achados.setdefault(nome, []).append((arquivo, len(mf)))
+            except (OSError, MacroFormatError):
+                continue
+        for nome, arquivos in achados.items():
+            for arquivo, eventos in arquivos:
+                chave = nome if len(arquivos) == 1 else arquivo[:-len(EXTENSION)]
+                path = os.path.join(self.root, arquivo)
+                self._index[chave] = {"arquivo": arquivo, "eventos": eventos, "hash": file_hash(path)}
+        self.loaded = True
+        return len(self._index)
+
+    def _write_index(self):
+        data = json.dumps({"versao": INDEX_VERSION, "perfis": self._index}, ensure_ascii=False, indent=2)
+        write_atomic(os.path.join(self.root, INDEX_FILE), lambda f: f.write(data.encode("utf-8")))
+
+    def names(self) -> List[str]:
+        return sorted(self._index)
+
+    def info(self, name: str) -> Dict[str, object]:
+        return self._index[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # ----- Corpos
+    def _file_name(self, name: str) -> str:
+        # Nome legível + hash do nome: qualquer texto vira um nome de arquivo válido e único
+        slug = re.sub(r"[^\w-]", "_", name)[:40]
+        return f"{slug}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}{EXTENSION}"
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, str(self._index[name]["arquivo"]))
+
+    def open(self, name: str) -> MacroFile:
+        # Para reprodução em streaming, sem decodificar a macro
+        return MacroFile(self.path(name))
+
+    def get(self, name: str) -> Macro:
+        # Trocar entre perfis já usados não decodifica de novo
+        key = (name, str(self._index[name].get("hash", "")))
+        macro = self.cache.get(key)
+        if macro is None:
+            macro = read_macro(self.path(name))
+            self.cache.put(key, macro)
+        return macro
+
+    def _put(self, name: str, macro: Macro):
+        os.makedirs(self.root, exist_ok=True)
+        arquivo = self._file_name(name)
+        path = os.path.join(self.root, arquivo)
+        write_macro(path, macro, compress=True, name=name)
+        self.cache.discard(name)
+        self._index[name] = {"arquivo": arquivo, "eventos": len(macro), "hash": file_hash(path)}
+
+    def save(self, name: str, macro: Macro):
+        self._put(name, macro)
+        self._write_index()
+
+    def save_many(self, macros: Dict[str, Macro]):
+        # Importação: um arquivo por perfil, o índice uma vez só no fim
+        for name, macro in macros.items():
+            self._put(name, macro)
+        self._write_index()
+
+    def delete(self, name: str):
+        path = self.path(name)
+        del self._index[name]
+        self.cache.discard(name)
+        self._write_index()  # primeiro o índice: um crash aqui só deixa um arquivo órfão
+        if os.path.exists(path):
+            os.remove(path)
+
+    # ----- Migração do formato antigo (tudo num único JSON)
+    def migrate_json(self, path: str) -> int:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("estrutura do arquivo de perfis inválida")
+        macros = {}
+        for name, rows in data.items():
+            try:
+                macros[name] = Macro.from_json(rows)
+            except (ValueError, TypeError, IndexError) as e:
+                print(f"Aviso: perfil '{name}' inválido não foi migrado ({e}).")
+        self.save_many(macros)
+        os.replace(path, path + ".migrado")  # mantido como backup, não é mais lido
+        return len(macros)
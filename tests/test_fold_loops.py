@@ -0,0 +1,57 @@
+import random
+
+from macro_engine import (
+    Macro, NS, OP_PRESS, OP_RELEASE, LOOP_TOLERANCE,
+    fold_loops, loop_regions, unfold_events,
+)
+
+TOL = int(LOOP_TOLERANCE * NS)
+MS = 1_000_000
+
+
+def repeticoes(reps: int, teclas: str, periodo: int, jitter_rep: int, jitter_evento: int, seed: int) -> Macro:
+    # Mesmo trecho gravado várias vezes: início de cada repetição a
+    # periodo ± jitter_rep, cada evento a ± jitter_evento da posição ideal
+    rnd = random.Random(seed)
+    m = Macro()
+    inicio = 0
+    for _ in range(reps):
+        t = inicio
+        for k in teclas:
+            t = max(t, inicio) + 40 * MS + rnd.randint(-jitter_evento, jitter_evento)
+            m.append_key(OP_PRESS, k, t)
+            t += 30 * MS + rnd.randint(-jitter_evento, jitter_evento)
+            m.append_key(OP_RELEASE, k, t)
+        inicio += periodo + rnd.randint(-jitter_rep, jitter_rep)
+    return m
+
+
+def erro_maximo(original: Macro, dobrada: Macro) -> int:
+    # Mesmas ações na mesma ordem; devolve o maior desvio de instante (ns)
+    a = list(original.events())
+    b = list(unfold_events(dobrada))
+    assert len(a) == len(b)
+    assert [ev[:4] for ev in a] == [ev[:4] for ev in b]
+    tempos = [ev[4] for ev in b]
+    assert tempos == sorted(tempos), "instantes desdobrados voltando no tempo"
+    return max(abs(x[4] - y[4]) for x, y in zip(a, b))
+
+
+def test_periodo_variavel_nao_acumula_deriva():
+    m = repeticoes(41, "farm", 600 * MS, 40 * MS, 0, seed=1)
+    dobrada = fold_loops(m)
+    assert erro_maximo(m, dobrada) <= TOL
+
+
+def test_repeticoes_aleatorias_ficam_na_tolerancia():
+    for seed in range(40):
+        m = repeticoes(30, "wasd"[: 1 + seed % 4], 400 * MS, 30 * MS, 15 * MS, seed)
+        assert erro_maximo(m, fold_loops(m)) <= TOL
+
+
+def test_repeticao_regular_continua_dobrando():
+    m = repeticoes(500, "farm", 500 * MS, 2 * MS, 2 * MS, seed=7)
+    dobrada = fold_loops(m)
+    assert len(loop_regions(dobrada)) >= 1
+    assert len(dobrada) < len(m) // 10
+    assert erro_maximo(m, dobrada) <= TOL